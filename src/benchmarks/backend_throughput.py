@@ -0,0 +1,91 @@
+"""
+Compara a vazão (frames por segundo) dos backends de detecção de pose.
+
+Uso (a partir da pasta src):
+    python -m benchmarks.backend_throughput --video video.mp4 --model models/pose_landmarker_full.task
+    python -m benchmarks.backend_throughput --video video.mp4 --landmarks landmarks.npy
+
+Sem --model, apenas o ReplayPoseBackend é medido, o que permite rodar o pipeline
+completo sem arquivo de modelo.
+"""
+import argparse
+import time
+
+import cv2
+
+from classes.personal_ai import PersonalAI
+from classes.pose_detector import (
+    BatchedCpuPoseBackend, MediaPipePoseBackend, ReplayPoseBackend, empty_landmark_batch
+)
+
+def read_frames(video_path, max_frames):
+    """
+    Decodifica até max_frames frames do vídeo, já convertidos para RGB.
+    """
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+def measure_backend(backend, frames, batch_size):
+    """
+    Retorna os frames por segundo do backend processando todos os frames em lotes de batch_size.
+    """
+    timestamps = [(i + 1) * 1000 / 30 for i in range(len(frames))]
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        backend.detect_batch(frames[i:i + batch_size], timestamps[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+    backend.close()
+    return len(frames) / elapsed
+
+def measure_pipeline(video_path, landmarks, batch_size):
+    """
+    Retorna os frames por segundo do PersonalAI completo (decodificação + análise)
+    usando o ReplayPoseBackend.
+    """
+    ai = PersonalAI(video_path, 'benchmark', None, pose_backend=ReplayPoseBackend(landmarks), batch_size=batch_size)
+    start = time.perf_counter()
+    ai.process_video(False, False)
+    elapsed = time.perf_counter() - start
+    return ai.frame / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', required=True, help='Vídeo usado como entrada.')
+    parser.add_argument('--model', help='Modelo .task do MediaPipe (habilita os backends MediaPipe).')
+    parser.add_argument('--landmarks', help='Arquivo .npy para o ReplayPoseBackend. Padrão: landmarks vazios.')
+    parser.add_argument('--frames', type=int, default=300, help='Número máximo de frames medidos.')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--num-poses', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=None, help='Instâncias do BatchedCpuPoseBackend.')
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise SystemExit(f"Não foi possível ler frames de '{args.video}'.")
+    landmarks = args.landmarks or empty_landmark_batch(len(frames), args.num_poses)
+
+    backends = {'replay': lambda: ReplayPoseBackend(landmarks)}
+    if args.model:
+        backends['mediapipe'] = lambda: MediaPipePoseBackend(args.model, args.num_poses)
+        backends['batched-cpu'] = lambda: BatchedCpuPoseBackend(args.model, args.num_poses, args.workers)
+
+    print(f"{len(frames)} frames de {frames[0].shape[1]}x{frames[0].shape[0]}")
+    print(f"{'backend':<14}{'lote':>6}{'frames/s':>12}")
+    for name, create_backend in backends.items():
+        for batch_size in args.batch_sizes:
+            fps = measure_backend(create_backend(), frames, batch_size)
+            print(f"{name:<14}{batch_size:>6}{fps:>12.1f}")
+
+    for batch_size in args.batch_sizes:
+        fps = measure_pipeline(args.video, landmarks, batch_size)
+        print(f"{'pipeline':<14}{batch_size:>6}{fps:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Mede as alocações por frame e a vazão da decodificação + conversão de cor,
+comparando o caminho antigo (novos arrays a cada frame) com o FrameBufferPool.
+
+Uso (a partir da pasta src):
+    python -m benchmarks.frame_allocations --video video.mp4
+
+As alocações são medidas com tracemalloc (o numpy e o OpenCV registram seus buffers nele):
+para cada frame, o pico de memória acima do uso anterior ao frame é somado.
+Os primeiros frames (--warmup) são ignorados para medir apenas o regime permanente.
+"""
+import argparse
+import time
+import tracemalloc
+
+import cv2
+
+from classes.frame_buffer_pool import FrameBufferPool
+
+def decode_allocating(cap):
+    ret, frame = cap.read()
+    if not ret:
+        return False
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return True
+
+def make_pooled_decoder(pool_size):
+    pool = FrameBufferPool(pool_size)
+
+    def decode_pooled(cap):
+        slot = pool.acquire()
+        try:
+            return pool.read_into(cap, slot)
+        finally:
+            pool.release(slot)
+    return decode_pooled
+
+def measure(video_path, decode, max_frames, warmup):
+    """
+    Retorna (frames medidos, bytes alocados por frame, frames por segundo).
+    """
+    cap = cv2.VideoCapture(video_path)
+    for _ in range(warmup):
+        decode(cap)
+
+    tracemalloc.start()
+    allocated = 0
+    frames = 0
+    start = time.perf_counter()
+    while frames < max_frames:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        if not decode(cap):
+            break
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+        frames += 1
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    cap.release()
+
+    if frames == 0:
+        raise SystemExit(f"O vídeo '{video_path}' tem menos de {warmup + 1} frames.")
+    return frames, allocated / frames, frames / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', required=True)
+    parser.add_argument('--frames', type=int, default=600, help='Número máximo de frames medidos.')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--pool-size', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'caminho':<14}{'frames':>8}{'KB/frame':>12}{'MB/s alocados':>16}{'frames/s':>12}")
+    for name, decode in [('alocando', decode_allocating), ('pool', make_pooled_decoder(args.pool_size))]:
+        frames, per_frame, fps = measure(args.video, decode, args.frames, args.warmup)
+        print(f"{name:<14}{frames:>8}{per_frame / 1024:>12.1f}{per_frame * fps / 2**20:>16.1f}{fps:>12.1f}")
+
+if __name__ == "__main__":
+    main()
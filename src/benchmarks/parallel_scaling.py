@@ -0,0 +1,45 @@
+"""
+Mede o tempo total de análise de um único vídeo com process_video_parallel
+variando o número de processos, comparado ao process_video serial.
+
+Uso (a partir da pasta src):
+    python -m benchmarks.parallel_scaling --video video.mp4 --model models/pose_landmarker_full.task
+    python -m benchmarks.parallel_scaling --video video.mp4 --landmarks landmarks.npy
+"""
+import argparse
+import os
+import time
+
+from classes.personal_ai import PersonalAI
+from classes.pose_detector import ReplayPoseBackend
+
+def build_ai(args):
+    backend = ReplayPoseBackend(args.landmarks) if args.landmarks else None
+    return PersonalAI(args.video, 'benchmark', args.model, pose_backend=backend)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', required=True)
+    parser.add_argument('--model', help='Modelo .task do MediaPipe.')
+    parser.add_argument('--landmarks', help='Arquivo .npy para o ReplayPoseBackend (dispensa o modelo).')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, os.cpu_count()])
+    args = parser.parse_args()
+    if not args.model and not args.landmarks:
+        parser.error('Informe --model ou --landmarks.')
+
+    ai = build_ai(args)
+    start = time.perf_counter()
+    ai.process_video(False, False)
+    serial = time.perf_counter() - start
+    print(f"{'modo':<12}{'processos':>10}{'tempo (s)':>12}{'speedup':>10}")
+    print(f"{'serial':<12}{1:>10}{serial:>12.2f}{1.0:>10.2f}")
+
+    for workers in sorted(set(args.workers)):
+        ai = build_ai(args)
+        start = time.perf_counter()
+        ai.process_video_parallel(workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"{'paralelo':<12}{workers:>10}{elapsed:>12.2f}{serial / elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Teste de carga do serviço HTTP local (service.py).
+
+Uso (a partir da pasta src, com o serviço rodando):
+    python -m benchmarks.service_load --video video.mp4 --jobs 20 --concurrency 8
+
+Envia --jobs vídeos com até --concurrency envios simultâneos, acompanha cada job até o fim
+e mostra quantos foram aceitos ou recusados (429), a latência e a vazão.
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+async def stream_file(path):
+    with open(path, 'rb') as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+async def run_job(session, args, index, stats):
+    start = time.perf_counter()
+    async with session.post(f"{args.url}/jobs", params={'name': f"carga-{index}"}, data=stream_file(args.video)) as resp:
+        if resp.status == 429:
+            stats['rejected'] += 1
+            return
+        resp.raise_for_status()
+        job_id = (await resp.json())['job_id']
+
+    while True:
+        await asyncio.sleep(args.poll_interval)
+        async with session.get(f"{args.url}/jobs/{job_id}") as resp:
+            status = (await resp.json())['status']
+        if status in ('done', 'failed'):
+            break
+    stats[status] += 1
+    stats['latencies'].append(time.perf_counter() - start)
+
+async def main(args):
+    stats = {'rejected': 0, 'done': 0, 'failed': 0, 'latencies': []}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited(session, index):
+        async with semaphore:
+            await run_job(session, args, index, stats)
+
+    start = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(limited(session, i) for i in range(args.jobs)))
+        async with session.get(f"{args.url}/metrics") as resp:
+            metrics = await resp.json()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(stats['latencies'])
+    print(f"Jobs concluídos: {stats['done']}  falhas: {stats['failed']}  recusados (429): {stats['rejected']}")
+    if latencies:
+        print(f"Latência (s): média {sum(latencies) / len(latencies):.2f}  p50 {latencies[len(latencies) // 2]:.2f}  máx {latencies[-1]:.2f}")
+    print(f"Vazão: {stats['done'] / elapsed * 60:.1f} vídeos/min em {elapsed:.1f} s")
+    print(f"Métricas do serviço: {metrics}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--video', required=True)
+    parser.add_argument('--jobs', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--poll-interval', type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
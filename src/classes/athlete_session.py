@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from .squat_analyzer import SquatRepetitionAnalyzer
+from .deviation_clip_exporter import DeviationIndex
+
+class AthleteSession:
+    def __init__(self, athlete_id, first_frame=0, **analyzer_params):
+        """
+        Agrupa o analisador e os dados por frame de um único atleta do vídeo.
+
+        Args:
+            athlete_id (int): Identificador do atleta atribuído pelo PoseTracker.
+            first_frame (int): Índice (a partir de 0) do frame do vídeo em que o atleta foi encontrado.
+            **analyzer_params: Parâmetros repassados ao SquatRepetitionAnalyzer.
+        """
+        self.athlete_id = athlete_id
+        self.first_frame = first_frame
+        self.squat_analyzer = SquatRepetitionAnalyzer(**analyzer_params)
+
+        # Landmarks (33, 4) do atleta em cada frame a partir de first_frame (None se não foi encontrado)
+        self.landmarks = []
+
+        # Linhas (tempo, cabeça, tronco, calcanhar, joelho) acumuladas durante o processamento;
+        # os DataFrames são montados uma única vez em finalize()
+        self._rows = []
+
+        # DataFrames para armazenar os dados de cada frame, mostrando se ouve algum desvio ou não
+        self.head_df = pd.DataFrame(columns=["Tempo (ms)", "Desvio da Cabeça"])
+        self.trunk_df = pd.DataFrame(columns=["Tempo (ms)", "Desvio do Tronco"])
+        self.heel_df = pd.DataFrame(columns=["Tempo (ms)", "Elevação do Calcanhar"])
+        self.knee_df = pd.DataFrame(columns=["Tempo (ms)", "Desvio do Joelho"])
+
+        # Intervalos com desvios, montados em finalize() a partir dos DataFrames acima
+        self.deviation_index = None
+
+        # Cinemática de cada repetição concluída (uma linha por repetição), montada em finalize()
+        self.kinematics_df = pd.DataFrame()
+
+    def process_frame(self, landmarks, ts, view_landmarks=None):
+        if not landmarks:
+            print(f"Nenhum landmark detectado no frame (atleta {self.athlete_id}).")
+
+        hp, tr, hl, kn = self.squat_analyzer.process_frame_landmarks(landmarks, ts, view_landmarks)
+        self._rows.append((int(ts), hp, tr, hl, kn))
+        self.landmarks.append(np.asarray(landmarks, dtype=np.float32) if landmarks else None)
+
+    def landmarks_at(self, frame_index):
+        """
+        Retorna os landmarks (33, 4) do atleta no frame frame_index do vídeo, ou None.
+        """
+        index = frame_index - self.first_frame
+        if 0 <= index < len(self.landmarks):
+            return self.landmarks[index]
+        return None
+
+    def finalize(self):
+        self.squat_analyzer.finalize_analysis()
+
+        times = [row[0] for row in self._rows]
+        for name, col in [('head_df', 1), ('trunk_df', 2), ('heel_df', 3), ('knee_df', 4)]:
+            columns = getattr(self, name).columns
+            setattr(self, name, pd.DataFrame({
+                columns[0]: times,
+                columns[1]: [row[col] for row in self._rows]
+            }))
+
+        self.deviation_index = DeviationIndex(self)
+        self.kinematics_df = pd.DataFrame(self.squat_analyzer.kinematics.reps)
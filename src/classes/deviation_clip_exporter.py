@@ -0,0 +1,147 @@
+import os
+import queue
+import threading
+
+import cv2
+import numpy as np
+import pandas as pd
+
+class DeviationIndex:
+    # DataFrame de desvios por frame -> nome da parte do corpo exibido
+    DEVIATION_FRAMES = {
+        'head_df': 'Cabeça',
+        'trunk_df': 'Tronco',
+        'heel_df': 'Calcanhar',
+        'knee_df': 'Joelho'
+    }
+
+    def __init__(self, session, padding_ms=500, merge_gap_ms=250):
+        """
+        Índice dos intervalos de tempo em que algum desvio foi sinalizado, usado tanto
+        para exportar os clipes quanto para exibir os momentos de desvio na interface.
+
+        Args:
+            session (AthleteSession | PersonalAI): Objeto com os DataFrames head_df, trunk_df, heel_df e knee_df.
+            padding_ms (int): Margem adicionada antes e depois de cada desvio.
+            merge_gap_ms (int): Intervalos separados por até esse tempo são unidos em um só.
+        """
+        self.padding_ms = padding_ms
+        self.merge_gap_ms = merge_gap_ms
+        self.intervals = self._build_intervals(session)
+
+    def _build_intervals(self, session):
+        flagged = []
+        for attr, part in self.DEVIATION_FRAMES.items():
+            df = getattr(session, attr)
+            times = df.loc[df.iloc[:, 1] == 1, 'Tempo (ms)']
+            flagged.extend((int(t), part) for t in times)
+        flagged.sort()
+
+        intervals = []
+        for t, part in flagged:
+            start, end = max(0, t - self.padding_ms), t + self.padding_ms
+            if intervals and start <= intervals[-1]['end_ms'] + self.merge_gap_ms:
+                intervals[-1]['end_ms'] = max(intervals[-1]['end_ms'], end)
+                intervals[-1]['parts'].add(part)
+            else:
+                intervals.append({'start_ms': start, 'end_ms': end, 'parts': {part}})
+        return intervals
+
+    def to_dataframe(self):
+        """
+        Retorna os intervalos em um DataFrame para exibição (tempos em segundos).
+        """
+        return pd.DataFrame({
+            'Início (s)': [round(i['start_ms'] / 1000, 2) for i in self.intervals],
+            'Fim (s)': [round(i['end_ms'] / 1000, 2) for i in self.intervals],
+            'Desvios': [', '.join(sorted(i['parts'])) for i in self.intervals]
+        })
+
+class DeviationClipExporter:
+    def __init__(self, ai, output_folder='clipes', draw=True, queue_size=32):
+        """
+        Exporta um clipe de vídeo para cada intervalo do DeviationIndex, decodificando
+        apenas os frames desses intervalos. A gravação dos arquivos é feita em uma thread
+        separada, enquanto a thread principal decodifica e desenha os próximos frames.
+
+        Args:
+            ai (PersonalAI): Instância já processada (usa o vídeo original e o desenho dos landmarks).
+            output_folder (str): Pasta onde os clipes são salvos.
+            draw (bool): Se True, desenha o esqueleto do atleta do clipe sobre os frames.
+            queue_size (int): Máximo de frames aguardando gravação.
+        """
+        self.ai = ai
+        self.output_folder = output_folder
+        self.draw = draw
+        self.queue_size = queue_size
+
+    def _writer_loop(self, frames_q):
+        # Cada item é (VideoWriter, frame); None encerra a thread
+        while True:
+            item = frames_q.get()
+            if item is None:
+                break
+            writer, frame = item
+            if frame is None:
+                writer.release()
+            else:
+                writer.write(frame)
+
+    def _draw_athlete(self, frame, landmarks, rgb):
+        # O estilo do desenho é definido em RGB: converte, desenha e volta para BGR no próprio frame
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        self.ai.draw_landmarks(rgb, landmarks[np.newaxis], out=rgb)
+        cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=frame)
+
+    def export(self, session, clip_name):
+        """
+        Grava os clipes dos intervalos do deviation_index da sessão e retorna a lista de caminhos gerados.
+        Apenas o esqueleto do atleta da sessão é desenhado.
+
+        Args:
+            session (AthleteSession): Sessão já finalizada do atleta.
+            clip_name (str): Prefixo do nome dos arquivos.
+        """
+        index = session.deviation_index
+        if not index.intervals:
+            return []
+        if not os.path.exists(self.output_folder):
+            os.makedirs(self.output_folder)
+
+        cap = cv2.VideoCapture(self.ai.file_name)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        # Buffer RGB reaproveitado para desenhar em todos os frames
+        rgb = np.empty((size[1], size[0], 3), dtype=np.uint8)
+
+        frames_q = queue.Queue(maxsize=self.queue_size)
+        writer_thread = threading.Thread(target=self._writer_loop, args=(frames_q,), daemon=True)
+        writer_thread.start()
+
+        paths = []
+        try:
+            for i, interval in enumerate(index.intervals, start=1):
+                path = os.path.join(self.output_folder, f"{clip_name}_{i:02d}_{interval['start_ms'] / 1000:.1f}s.mp4")
+                writer = cv2.VideoWriter(path, fourcc, fps, size)
+
+                # O frame de índice n (a partir de 0) tem o timestamp (n + 1) * 1000 / fps na análise
+                frame_index = max(0, int(interval['start_ms'] * fps / 1000) - 1)
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+                while (frame_index + 1) * 1000 / fps <= interval['end_ms']:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    landmarks = session.landmarks_at(frame_index) if self.draw else None
+                    if landmarks is not None:
+                        self._draw_athlete(frame, landmarks, rgb)
+                    frames_q.put((writer, frame))
+                    frame_index += 1
+
+                frames_q.put((writer, None))
+                paths.append(path)
+        finally:
+            frames_q.put(None)
+            writer_thread.join()
+            cap.release()
+        return paths
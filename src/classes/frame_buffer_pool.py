@@ -0,0 +1,55 @@
+from collections import deque
+
+import cv2
+import numpy as np
+
+class FrameBufferPool:
+    def __init__(self, size):
+        """
+        Anel de buffers reutilizáveis para os frames do vídeo, evitando alocar
+        novos arrays a cada frame na decodificação e na conversão de cor.
+
+        Cada posição (slot) tem um buffer BGR (decodificação) e um RGB (conversão).
+        Os buffers são criados no primeiro uso com o tamanho real do frame e depois
+        apenas sobrescritos. Um slot pertence a quem o adquiriu com acquire() até
+        ser devolvido com release(); enquanto isso, seus buffers não são reutilizados.
+
+        Args:
+            size (int): Número de slots (frames em uso ao mesmo tempo).
+        """
+        self.size = size
+        self.bgr = [None] * size
+        self.rgb = [None] * size
+        # Buffer único para desenhar os landmarks antes de mostrar o frame
+        self.overlay = None
+        self._free = deque(range(size))
+
+    def acquire(self):
+        if not self._free:
+            raise RuntimeError("Nenhum buffer livre no FrameBufferPool. Libere um slot antes de ler outro frame.")
+        return self._free.popleft()
+
+    def release(self, slot):
+        self._free.append(slot)
+
+    def read_into(self, cap, slot):
+        """
+        Decodifica o próximo frame de cap direto no buffer BGR do slot e converte
+        para RGB no buffer RGB do slot. Retorna False quando o vídeo acabou.
+        """
+        ret, frame = cap.read(self.bgr[slot])
+        if not ret:
+            return False
+        # Se o buffer ainda não existia (ou mudou de tamanho), o OpenCV alocou um novo: passa a reutilizá-lo
+        self.bgr[slot] = frame
+        self.rgb[slot] = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb[slot])
+        return True
+
+    def overlay_like(self, rgb):
+        """
+        Retorna o buffer de desenho com o mesmo formato do frame RGB,
+        alocando-o apenas no primeiro uso.
+        """
+        if self.overlay is None or self.overlay.shape != rgb.shape:
+            self.overlay = np.empty_like(rgb)
+        return self.overlay
@@ -0,0 +1,121 @@
+import queue
+import threading
+
+import cv2
+
+from .frame_buffer_pool import FrameBufferPool
+
+class ViewStream(threading.Thread):
+    def __init__(self, name, file_name, pose_backend, batch_size=1, queue_size=64):
+        """
+        Decodifica e detecta as poses de uma câmera adicional em uma thread própria,
+        em paralelo com a câmera principal. Os resultados (timestamp em ms, landmarks
+        (poses, 33, 4)) ficam em uma fila limitada, consumida pelo NearestFrameAligner.
+
+        Args:
+            name (str): Nome da vista (ex.: 'frontal').
+            file_name (str): Vídeo da câmera.
+            pose_backend (PoseBackend): Backend exclusivo desta câmera.
+            batch_size (int): Frames por chamada de detect_batch.
+            queue_size (int): Máximo de frames detectados aguardando o alinhamento.
+        """
+        super().__init__(name=f"view-{name}", daemon=True)
+        self.view_name = name
+        self.file_name = file_name
+        self.pose_backend = pose_backend
+        self.batch_size = batch_size
+        self.results = queue.Queue(maxsize=queue_size)
+        # Erro que impediu a leitura da câmera (arquivo inválido, nenhum frame lido ou falha na detecção)
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def _put(self, item):
+        # Espera vaga na fila sem travar a thread caso o processamento seja interrompido
+        while not self._stop_event.is_set():
+            try:
+                self.results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        cap = cv2.VideoCapture(self.file_name)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        pool = FrameBufferPool(self.batch_size)
+        ts = 0
+        frames_read = 0
+        try:
+            if not cap.isOpened():
+                self.error = IOError(f"Não foi possível abrir o vídeo '{self.file_name}'.")
+                return
+            while not self._stop_event.is_set():
+                slots, timestamps = [], []
+                while len(slots) < self.batch_size:
+                    slot = pool.acquire()
+                    if not pool.read_into(cap, slot):
+                        pool.release(slot)
+                        break
+                    ts += 1000 / fps
+                    slots.append(slot)
+                    timestamps.append(ts)
+                if not slots:
+                    break
+                frames_read += len(slots)
+
+                landmark_batch = self.pose_backend.detect_batch([pool.rgb[slot] for slot in slots], timestamps)
+                for slot in slots:
+                    pool.release(slot)
+                for frame_ts, poses in zip(timestamps, landmark_batch):
+                    if not self._put((frame_ts, poses)):
+                        return
+            if frames_read == 0 and not self._stop_event.is_set():
+                self.error = IOError(f"Nenhum frame pôde ser lido do vídeo '{self.file_name}'.")
+        except Exception as e:
+            self.error = e
+        finally:
+            cap.release()
+            self.pose_backend.close()
+            self._put(None)
+
+    def frames(self):
+        """
+        Itera sobre os frames detectados, na ordem do vídeo, até o final da câmera.
+        """
+        while True:
+            item = self.results.get()
+            if item is None:
+                return
+            yield item
+
+    def stop(self):
+        self._stop_event.set()
+
+class NearestFrameAligner:
+    def __init__(self, frames, max_offset_ms=50):
+        """
+        Alinha uma câmera adicional à câmera principal pelo timestamp: para cada instante
+        da câmera principal, retorna os landmarks do frame mais próximo.
+        Nenhum frame é lido antes da primeira chamada de at().
+
+        Args:
+            frames (iterable): Pares (timestamp em ms, landmarks) em ordem crescente de tempo.
+            max_offset_ms (float): Diferença máxima de tempo aceita; acima disso retorna None.
+        """
+        self._frames = iter(frames)
+        self.max_offset_ms = max_offset_ms
+        self._current = None
+        self._next = None
+        self._started = False
+
+    def at(self, ts):
+        if not self._started:
+            self._next = next(self._frames, None)
+            self._started = True
+        # Os instantes consultados são crescentes: avança enquanto o próximo frame estiver tão perto de ts quanto o atual
+        while self._next is not None and (self._current is None or abs(self._next[0] - ts) <= abs(self._current[0] - ts)):
+            self._current, self._next = self._next, next(self._frames, None)
+
+        if self._current is None or abs(self._current[0] - ts) > self.max_offset_ms:
+            return None
+        return self._current[1]
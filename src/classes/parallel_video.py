@@ -0,0 +1,223 @@
+import multiprocessing
+import multiprocessing.util
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from .frame_buffer_pool import FrameBufferPool
+
+# Intervalos planejados por processo: intervalos menores fazem com que, ao atingir a meta de
+# repetições, os que ainda não começaram sejam de fato cancelados sem serem decodificados
+CHUNKS_PER_WORKER = 4
+
+# Estado de cada processo do pool: o evento interrompe os intervalos em andamento, a fila recebe
+# os landmarks de cada lote assim que são detectados e o backend é reaproveitado entre os intervalos
+_stop_event = None
+_results_queue = None
+_backend = None
+
+def _init_worker(stop_event, results_queue, backend_factory):
+    global _stop_event, _results_queue, _backend
+    _stop_event = stop_event
+    _results_queue = results_queue
+    # Ao encerrar, o processo não espera que o processo principal consuma os lotes ainda na fila
+    results_queue.cancel_join_thread()
+    _backend = backend_factory()
+    multiprocessing.util.Finalize(_backend, _backend.close, exitpriority=10)
+
+def video_info(file_name):
+    """
+    Retorna (fps, número de frames informado pelo arquivo) do vídeo.
+    """
+    cap = cv2.VideoCapture(file_name)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, total_frames
+
+def plan_chunks(total_frames, num_chunks):
+    """
+    Divide os índices de frame [0, total_frames) em até num_chunks intervalos contíguos (início, fim).
+    O último intervalo tem fim None: é lido até o final do vídeo, já que a contagem
+    de frames informada pelo arquivo nem sempre é exata.
+    """
+    if total_frames <= 0:
+        return [(0, None)]
+    num_chunks = max(1, min(num_chunks, total_frames))
+    step = -(-total_frames // num_chunks)
+    chunks = [(start, start + step) for start in range(0, total_frames, step)]
+    chunks[-1] = (chunks[-1][0], None)
+    return chunks
+
+def detect_chunk(chunk_index, file_name, start, end, overlap, batch_size):
+    """
+    Executado em um processo separado: decodifica e detecta as poses dos frames [start, end).
+    Os landmarks (frames, poses, 33, 4) de cada lote são enviados para a fila de resultados como
+    (chunk_index, landmarks) assim que detectados; (chunk_index, None) indica o fim do intervalo.
+    A leitura começa overlap frames antes de start, para backends que dependem dos frames
+    anteriores; esses frames são processados mas descartados.
+    Para no próximo lote se o processamento for interrompido (ver ParallelVideoStream.stop).
+    Retorna o número de frames decodificados.
+    """
+    frames_decoded = 0
+    try:
+        if _stop_event.is_set():
+            return frames_decoded
+
+        cap = cv2.VideoCapture(file_name)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        pool = FrameBufferPool(batch_size)
+
+        warm_start = max(0, start - overlap)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, warm_start)
+        if hasattr(_backend, 'seek'):
+            _backend.seek(warm_start)
+
+        index = warm_start
+        finished = False
+        try:
+            while not finished and (end is None or index < end):
+                if _stop_event.is_set():
+                    break
+                slots, timestamps = [], []
+                while len(slots) < batch_size and (end is None or index + len(slots) < end):
+                    slot = pool.acquire()
+                    if not pool.read_into(cap, slot):
+                        pool.release(slot)
+                        finished = True
+                        break
+                    slots.append(slot)
+                    timestamps.append((index + len(slots)) * 1000 / fps)
+                frames_decoded += len(slots)
+
+                if slots:
+                    landmark_batch = _backend.detect_batch([pool.rgb[slot] for slot in slots], timestamps)
+                    # Envia apenas os frames que pertencem ao intervalo (descarta a sobreposição)
+                    keep_from = max(0, start - index)
+                    if keep_from < len(slots):
+                        _results_queue.put((chunk_index, landmark_batch[keep_from:]))
+                    index += len(slots)
+
+                for slot in slots:
+                    pool.release(slot)
+        finally:
+            cap.release()
+    finally:
+        _results_queue.put((chunk_index, None))
+    return frames_decoded
+
+class ParallelVideoStream:
+    def __init__(self, file_name, backend_factory, workers, overlap=0, batch_size=1):
+        """
+        Divide o vídeo em intervalos de frames e detecta as poses de cada intervalo em
+        um processo separado. start() inicia os processos sem esperar por resultados, para
+        que várias câmeras possam ser iniciadas juntas; chunks() gera os landmarks na ordem
+        do vídeo, lote a lote, assim que chegam dos processos.
+
+        O vídeo é dividido em mais intervalos do que processos (CHUNKS_PER_WORKER por processo).
+        stop() interrompe os intervalos em andamento no próximo lote e cancela os que ainda
+        não começaram; frames_decoded informa quantos frames foram de fato decodificados.
+        Se o vídeo não puder ser aberto ou nenhum frame for decodificado, o erro fica em error.
+
+        Args:
+            file_name (str): Caminho do vídeo.
+            backend_factory (callable): Cria o backend de pose de cada processo, usado em todos os
+                intervalos do processo (ver PoseBackend.worker_factory).
+            workers (int): Número de processos.
+            overlap (int): Frames lidos antes de cada intervalo e descartados. Só faz diferença
+                para backends com estado entre frames; os backends atuais (MediaPipe em modo
+                IMAGE e Replay) tratam cada frame de forma independente, por isso o padrão é 0.
+            batch_size (int): Frames por chamada de detect_batch em cada processo.
+        """
+        self.file_name = file_name
+        self.backend_factory = backend_factory
+        self.workers = workers
+        self.overlap = overlap
+        self.batch_size = batch_size
+        # Frames decodificados pelos processos, somados em stop()
+        self.frames_decoded = 0
+        # Erro que impediu a leitura do vídeo (arquivo inválido ou nenhum frame decodificado)
+        self.error = None
+        self._executor = None
+        self._futures = []
+        self._stop_event = None
+        self._results_queue = None
+
+    def start(self):
+        cap = cv2.VideoCapture(self.file_name)
+        opened = cap.isOpened()
+        cap.release()
+        if not opened:
+            # Sem processos: chunks() não gera nenhum lote
+            self.error = IOError(f"Não foi possível abrir o vídeo '{self.file_name}'.")
+            return
+
+        _, total_frames = video_info(self.file_name)
+        chunks = plan_chunks(total_frames, self.workers * CHUNKS_PER_WORKER)
+
+        # spawn evita herdar o estado do MediaPipe/OpenCV do processo principal
+        context = multiprocessing.get_context('spawn')
+        self._stop_event = context.Event()
+        self._results_queue = context.Queue()
+        self._executor = ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)), mp_context=context,
+                                             initializer=_init_worker, initargs=(self._stop_event, self._results_queue, self.backend_factory))
+        self._futures = [
+            self._executor.submit(detect_chunk, chunk_index, self.file_name, start, end, self.overlap, self.batch_size)
+            for chunk_index, (start, end) in enumerate(chunks)
+        ]
+
+    def chunks(self):
+        """
+        Itera sobre os landmarks (frames, poses, 33, 4) de cada lote, na ordem do vídeo.
+        Lotes de intervalos posteriores que chegam antes da vez ficam guardados até serem gerados.
+        """
+        pending = {chunk_index: [] for chunk_index in range(len(self._futures))}
+        finished = set()
+        for chunk_index, future in enumerate(self._futures):
+            while True:
+                while pending[chunk_index]:
+                    yield pending[chunk_index].pop(0)
+                if chunk_index in finished:
+                    break
+                try:
+                    result_index, landmarks = self._results_queue.get(timeout=0.1)
+                except queue.Empty:
+                    # Se o processo falhou sem enviar o fim do intervalo, propaga o erro
+                    if future.done() and future.exception() is not None:
+                        future.result()
+                    continue
+                if landmarks is None:
+                    finished.add(result_index)
+                else:
+                    pending[result_index].append(landmarks)
+            future.result()
+
+    def stop(self):
+        """
+        Interrompe os processos em andamento, espera que terminem e soma os frames decodificados.
+        """
+        if self._executor is None:
+            return
+        self._stop_event.set()
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown()
+        self._executor = None
+        self.frames_decoded = sum(
+            future.result() for future in self._futures
+            if not future.cancelled() and future.exception() is None
+        )
+        if self.frames_decoded == 0:
+            self.error = IOError(f"Nenhum frame pôde ser lido do vídeo '{self.file_name}'.")
+
+def iter_timestamped_frames(chunks, fps):
+    """
+    Percorre os lotes gerados por ParallelVideoStream.chunks frame a frame,
+    gerando (timestamp em ms, landmarks) de cada frame.
+    """
+    index = 0
+    for chunk in chunks:
+        for poses in chunk:
+            index += 1
+            yield index * 1000 / fps, poses
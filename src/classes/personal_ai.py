@@ -1,4 +1,4 @@
-import pandas as pd
+import os
 import cv2
 import numpy as np
 import queue
@@ -6,105 +6,327 @@ from mediapipe import solutions
 from mediapipe.framework.formats import landmark_pb2
 
 # Importar as classes que PersonalAI utiliza
-from .pose_detector import PoseDetector
-from .squat_analyzer import SquatRepetitionAnalyzer
+from .pose_detector import MediaPipePoseBackend, landmarks_from_array
+from .pose_tracker import PoseTracker
+from .athlete_session import AthleteSession
+from .frame_buffer_pool import FrameBufferPool
+from .parallel_video import ParallelVideoStream, iter_timestamped_frames, video_info
+from .multi_view import ViewStream, NearestFrameAligner
 
 class PersonalAI:
     def __init__(self, file_name, name_pessoa, model_path,
                  descent_threshold=0.05, ascent_return_threshold=0.02,
                  trunk_error_threshold=5, knee_error_threshold=5,
-                 head_error_threshold=5, foot_error_threshold=5):
+                 head_error_threshold=5, foot_error_threshold=5,
+                 num_poses=1, pose_backend=None, batch_size=1,
+                 extra_views=None, extra_view_backends=None, view_max_offset_ms=50,
+                 repetition_target=3):
+        """
+        file_name: vídeo da câmera sagital, que define as fases das repetições.
+        pose_backend: qualquer backend com a interface PoseBackend (ver pose_detector.py).
+                      Se não for informado, usa o MediaPipePoseBackend com o model_path.
+        batch_size: número de frames enviados juntos para detect_batch do backend.
+        extra_views: vídeos de outras câmeras da mesma série, sincronizados com o sagital
+                     ({'frontal': 'video_frontal.mp4'}). Só podem ser usados com um único atleta
+                     (num_poses=1): as poses das outras câmeras não são associadas aos atletas.
+        extra_view_backends: backend de cada câmera extra. Padrão: um backend equivalente ao pose_backend.
+        view_max_offset_ms: diferença máxima de tempo para alinhar um frame das câmeras extras.
+        repetition_target: número de repetições da série. Quando todos os atletas o atingem,
+                           a decodificação e a detecção de pose são encerradas.
+        """
     
         self.file_name = file_name
         self.name_pessoa = name_pessoa
         self.image_q = queue.Queue()
         
-        self.pose_detector = PoseDetector(model_path)
-        self.squat_analyzer = SquatRepetitionAnalyzer(
-            descent_threshold=descent_threshold,
-            ascent_return_threshold=ascent_return_threshold,
-            trunk_error_threshold=trunk_error_threshold, 
-            knee_error_threshold=knee_error_threshold,   
-            head_error_threshold=head_error_threshold,   
-            foot_error_threshold=foot_error_threshold    
-        )
-
-        # DataFrames para armazenar os dados de cada frame, mostrando se ouve algum desvio ou não
-        self.head_df = pd.DataFrame(columns=["Tempo (ms)", "Desvio da Cabeça"])
-        self.trunk_df = pd.DataFrame(columns=["Tempo (ms)", "Desvio do Tronco"])
-        self.heel_df = pd.DataFrame(columns=["Tempo (ms)", "Elevação do Calcanhar"])
-        self.knee_df = pd.DataFrame(columns=["Tempo (ms)", "Desvio do Joelho"])
+        self.pose_backend = pose_backend or MediaPipePoseBackend(model_path, num_poses=num_poses)
+        self.batch_size = batch_size
+        # Um slot de buffer por frame do lote: os frames são decodificados e convertidos sem novas alocações
+        self.frame_pool = FrameBufferPool(batch_size)
+        self.pose_tracker = PoseTracker(max_tracks=self.pose_backend.num_poses)
+        self.extra_views = extra_views or {}
+        if self.extra_views and self.pose_backend.num_poses > 1:
+            raise ValueError("Câmeras extras (extra_views) só podem ser usadas com um único atleta (num_poses=1).")
+        self.extra_view_backends = extra_view_backends or {}
+        self.view_max_offset_ms = view_max_offset_ms
+        self.analyzer_params = {
+            'descent_threshold': descent_threshold,
+            'ascent_return_threshold': ascent_return_threshold,
+            'trunk_error_threshold': trunk_error_threshold,
+            'knee_error_threshold': knee_error_threshold,
+            'head_error_threshold': head_error_threshold,
+            'foot_error_threshold': foot_error_threshold,
+            'repetition_target': repetition_target
+        }
+
+        # Uma sessão (analisador + DataFrames por frame) para cada atleta acompanhado.
+        # O atleta 1 sempre existe, mantendo o comportamento do vídeo com uma única pessoa.
+        self.sessions = {1: AthleteSession(1, **self.analyzer_params)}
+        
+        # Landmarks (poses, 33, 4) de cada frame processado, na ordem do vídeo
+        self.landmarks = []
         
         self.frame = 0
+        # Erros das câmeras extras que não puderam ser analisadas ({'frontal': 'mensagem'})
+        self.view_errors = {}
+        # Frames do vídeo que não chegaram a ser decodificados porque a meta de repetições já tinha sido atingida
+        self.frames_skipped = 0
+
+    # O atleta 1 continua acessível pelos atributos usados antes da análise multi-atleta
+    @property
+    def squat_analyzer(self):
+        return self.sessions[1].squat_analyzer
+
+    @property
+    def head_df(self):
+        return self.sessions[1].head_df
+
+    @property
+    def trunk_df(self):
+        return self.sessions[1].trunk_df
+
+    @property
+    def heel_df(self):
+        return self.sessions[1].heel_df
+
+    @property
+    def knee_df(self):
+        return self.sessions[1].knee_df
+
+    @property
+    def analysis_complete(self):
+        """
+        True quando todos os atletas acompanhados atingiram a meta de repetições.
+        Com mais de um atleta, só é verdadeiro depois que todos foram encontrados no vídeo.
+        """
+        return (len(self.sessions) >= self.pose_tracker.max_tracks and
+                all(session.squat_analyzer.analysis_complete for session in self.sessions.values()))
+
+    def _analyze_poses(self, poses, ts, view_landmarks=None):
+        """
+        Associa as poses do frame aos atletas e alimenta o analisador de cada um.
+        Atletas não encontrados neste frame recebem None, como um frame sem landmarks.
+        Os landmarks das câmeras extras (view_landmarks) vão apenas para o atleta 1.
+        """
+        assignments = self.pose_tracker.update(poses)
+        for athlete_id in assignments:
+            if athlete_id not in self.sessions:
+                self.sessions[athlete_id] = AthleteSession(athlete_id, first_frame=self.frame - 1, **self.analyzer_params)
+
+        for athlete_id, session in self.sessions.items():
+            session.process_frame(assignments.get(athlete_id), ts, view_landmarks if athlete_id == 1 else None)
+
+    def _analyze_frame(self, poses, ts, view_poses=None):
+        """
+        Registra o array de landmarks (poses, 33, 4) do frame e o envia para a análise.
+        view_poses: arrays de landmarks das câmeras extras alinhados a este frame (ou None).
+        """
+        self.landmarks.append(poses)
+        view_landmarks = {}
+        for name, arr in (view_poses or {}).items():
+            detected = landmarks_from_array(arr) if arr is not None else []
+            view_landmarks[name] = detected[0] if detected else None
+        self._analyze_poses(landmarks_from_array(poses), ts, view_landmarks)
+
+    def _view_backend(self, name):
+        return self.extra_view_backends.get(name) or self.pose_backend.worker_factory()()
+
+    def _start_view_streams(self):
+        """
+        Inicia a decodificação e a detecção de cada câmera extra em sua própria thread.
+        Retorna as threads e um NearestFrameAligner por câmera.
+        """
+        streams = [
+            ViewStream(name, file_name, self._view_backend(name), self.batch_size)
+            for name, file_name in self.extra_views.items()
+        ]
+        for stream in streams:
+            stream.start()
+        aligners = {
+            stream.view_name: NearestFrameAligner(stream.frames(), self.view_max_offset_ms)
+            for stream in streams
+        }
+        return streams, aligners
+
+    def _report_view_errors(self, errors):
+        """
+        Registra em view_errors as câmeras extras que falharam ({nome: exceção ou None}).
+        As verificações dessas câmeras não foram feitas.
+        """
+        for name, error in errors.items():
+            if error is None:
+                continue
+            self.view_errors[name] = str(error)
+            print(f"ATENÇÃO: A vista '{name}' não foi analisada e as verificações dela foram ignoradas: {error}")
+
+    def _finish_analysis(self, total_frames, frames_decoded):
+        if self.analysis_complete:
+            self.frames_skipped = max(0, total_frames - frames_decoded)
+            print(f"Meta de repetições atingida: {self.frames_skipped} frame(s) restantes não foram decodificados.")
+
+        for session in self.sessions.values():
+            session.finalize()
+        
+        self.image_q.put((1, 1, 'done')) # Sinaliza que o processamento/fluxo de frames foi concluído.
 
-    def draw_landmarks(self, rgb, res):
-        out = np.copy(rgb)
-        if res.pose_landmarks: 
-            for pose_landmark_group in res.pose_landmarks: 
-                proto = landmark_pb2.NormalizedLandmarkList()
-                proto.landmark.extend([
-                    landmark_pb2.NormalizedLandmark(x=l.x, y=l.y, z=l.z)
-                    for l in pose_landmark_group 
-                ])
-                solutions.drawing_utils.draw_landmarks(
-                    out, proto,
-                    solutions.pose.POSE_CONNECTIONS,
-                    solutions.drawing_styles.get_default_pose_landmarks_style()
-                )
+    def save_landmarks(self, path):
+        """
+        Salva os landmarks de todos os frames em um arquivo .npy,
+        que pode ser reproduzido depois com o ReplayPoseBackend.
+        """
+        np.save(path, np.stack(self.landmarks))
+
+    def draw_landmarks(self, rgb, poses, out=None):
+        """
+        Desenha os landmarks sobre uma cópia do frame RGB.
+        Se out for informado, a cópia é feita nesse array em vez de alocar um novo
+        (com out=rgb, desenha direto no próprio frame).
+        """
+        if out is None:
+            out = np.copy(rgb)
+        elif out is not rgb:
+            np.copyto(out, rgb)
+        for pose_landmark_group in landmarks_from_array(poses): 
+            proto = landmark_pb2.NormalizedLandmarkList()
+            proto.landmark.extend([
+                landmark_pb2.NormalizedLandmark(x=l.x, y=l.y, z=l.z)
+                for l in pose_landmark_group 
+            ])
+            solutions.drawing_utils.draw_landmarks(
+                out, proto,
+                solutions.pose.POSE_CONNECTIONS,
+                solutions.drawing_styles.get_default_pose_landmarks_style()
+            )
         return out
 
     def process_video(self, draw, display):
         cap = cv2.VideoCapture(self.file_name)
         fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         ts = 0
+        frames_decoded = 0
+        finished = False
+        # As câmeras extras são processadas em paralelo com a sagital, em outras threads
+        view_streams, view_aligners = self._start_view_streams()
         
         try:
-            while cap.isOpened():
-                #ret é um booleano que indica se o frame ainda está sendo lido ou se o vídeo já acabou e o frame é a imagem capturada
-                ret, frame = cap.read()
-                if not ret:
+            while cap.isOpened() and not finished:
+                # Lê até batch_size frames para enviar juntos ao backend.
+                # Cada frame ocupa um slot do pool até ser analisado e exibido.
+                slots, timestamps = [], []
+                while len(slots) < self.batch_size:
+                    slot = self.frame_pool.acquire()
+                    #read_into retorna False quando o vídeo já acabou
+                    if not self.frame_pool.read_into(cap, slot):
+                        self.frame_pool.release(slot)
+                        finished = True
+                        break
+                        
+                    ts += 1000 / fps
+                    frames_decoded += 1
+                    slots.append(slot)
+                    timestamps.append(ts)
+
+                if not slots:
                     break
-                    
-                self.frame += 1
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                ts += 1000 / fps
                 
-                res = self.pose_detector.detect(rgb)
+                rgb_frames = [self.frame_pool.rgb[slot] for slot in slots]
+                landmark_batch = self.pose_backend.detect_batch(rgb_frames, timestamps)
                 
-                current_hp, current_tr, current_hl, current_kn = 0, 0, 0, 0 
-                if res.pose_landmarks and res.pose_landmarks[0]:
-                    current_hp, current_tr, current_hl, current_kn = \
-                        self.squat_analyzer.process_frame_landmarks(res.pose_landmarks[0], ts)
-                else:
-                    current_hp, current_tr, current_hl, current_kn = \
-                        self.squat_analyzer.process_frame_landmarks(None, ts)
-                    print("Nenhum landmark detectado no frame.")
-
-                # Adiciona os dados ao DataFrame correspondente    
-                for df, val in [
-                    (self.head_df, current_hp), 
-                    (self.trunk_df, current_tr),
-                    (self.heel_df, current_hl), 
-                    (self.knee_df, current_kn)
-                ]:
-                    df.loc[len(df)] = [int(ts), val]
-
-                # Desenha os landmarks se necessário
-                if draw:
-                    frame = self.draw_landmarks(rgb, res)
-
-                # Mostra o frame se necessário    
-                if display:
-                    cv2.imshow('Frame', frame)
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                for slot, frame_ts, poses in zip(slots, timestamps, landmark_batch):
+                    self.frame += 1
+                    view_poses = {name: aligner.at(frame_ts) for name, aligner in view_aligners.items()}
+                    self._analyze_frame(poses, frame_ts, view_poses)
+
+                    frame = self.frame_pool.bgr[slot]
+                    # Desenha os landmarks se necessário
+                    if draw:
+                        rgb = self.frame_pool.rgb[slot]
+                        frame = self.draw_landmarks(rgb, poses, out=self.frame_pool.overlay_like(rgb))
+
+                    # Mostra o frame se necessário    
+                    if display:
+                        cv2.imshow('Frame', frame)
+                        if cv2.waitKey(1) & 0xFF == ord('q'):
+                            finished = True
+                            break
+
+                    # Nenhum frame seguinte pode alterar o resultado: encerra a leitura do vídeo
+                    if self.analysis_complete:
+                        finished = True
                         break
+
+                for slot in slots:
+                    self.frame_pool.release(slot)
         except Exception as e:
             print(f"ATENÇÃO: Ocorreu um erro durante o processamento do vídeo: {e}")
         finally:
+            for stream in view_streams:
+                stream.stop()
+            for stream in view_streams:
+                stream.join()
             cap.release()
             cv2.destroyAllWindows()
-            self.pose_detector.close()
+            self.pose_backend.close()
         
-        self.squat_analyzer.finalize_analysis()
+        self._report_view_errors({stream.view_name: stream.error for stream in view_streams})
+        self._finish_analysis(total_frames, frames_decoded)
+
+    def process_video_parallel(self, workers=None, chunk_overlap=0):
+        """
+        Processa o vídeo dividindo a decodificação e a detecção de pose em intervalos de frames,
+        cada um em um processo separado. Os landmarks são costurados na ordem do vídeo e analisados
+        sequencialmente, então a detecção de fases e os contadores de erros consecutivos
+        se comportam exatamente como em process_video.
+
+        Args:
+            workers (int): Número total de processos, divididos entre as câmeras. Padrão: número de CPUs.
+            chunk_overlap (int): Frames lidos e descartados antes de cada intervalo. Só é necessário
+                para backends com estado entre frames (ver ParallelVideoStream).
+        """
+        workers = workers or os.cpu_count() or 1
+        # As câmeras são processadas ao mesmo tempo e disputam os mesmos núcleos
+        stream_workers = max(1, workers // (1 + len(self.extra_views)))
+        fps, total_frames = video_info(self.file_name)
+
+        stream = ParallelVideoStream(self.file_name, self.pose_backend.worker_factory(), stream_workers, chunk_overlap, self.batch_size)
+        # As câmeras extras também são divididas entre os processos e alinhadas pelo tempo
+        view_streams, view_fps = {}, {}
+        for name, file_name in self.extra_views.items():
+            backend_factory = self.extra_view_backends[name].worker_factory() if name in self.extra_view_backends else self.pose_backend.worker_factory()
+            view_streams[name] = ParallelVideoStream(file_name, backend_factory, stream_workers, chunk_overlap, self.batch_size)
+            view_fps[name], _ = video_info(file_name)
+        all_streams = [stream, *view_streams.values()]
+
+        try:
+            # Todas as câmeras são iniciadas antes de esperar pelo primeiro resultado de qualquer uma
+            for parallel_stream in all_streams:
+                parallel_stream.start()
+            view_aligners = {
+                name: NearestFrameAligner(iter_timestamped_frames(view_stream.chunks(), view_fps[name]), self.view_max_offset_ms)
+                for name, view_stream in view_streams.items()
+            }
+
+            ts = 0
+            # Os lotes chegam assim que cada processo os detecta; ao atingir a meta, stop() interrompe
+            # os intervalos em andamento e cancela os que ainda não começaram
+            for batch in stream.chunks():
+                for poses in batch:
+                    self.frame += 1
+                    ts += 1000 / fps
+                    view_poses = {name: aligner.at(ts) for name, aligner in view_aligners.items()}
+                    self._analyze_frame(poses, ts, view_poses)
+                    if self.analysis_complete:
+                        break
+                if self.analysis_complete:
+                    break
+        finally:
+            # Interrompe os processos que ainda estiverem trabalhando
+            for parallel_stream in all_streams:
+                parallel_stream.stop()
+            self.pose_backend.close()
         
-        self.image_q.put((1, 1, 'done')) # Sinaliza que o processamento/fluxo de frames foi concluído.
\ No newline at end of file
+        if stream.error is not None:
+            print(f"ATENÇÃO: Ocorreu um erro durante o processamento do vídeo: {stream.error}")
+        self._report_view_errors({name: view_stream.error for name, view_stream in view_streams.items()})
+        self._finish_analysis(total_frames, stream.frames_decoded)
@@ -1,15 +1,173 @@
+import os
+from collections import namedtuple
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Protocol
+
+import numpy as np
 import mediapipe as mp
+from mediapipe.tasks import python as mp_tasks
 from mediapipe.tasks.python import vision
 
-class PoseDetector:
-    def __init__(self, model_path):
-        self._landmarker = vision.PoseLandmarker.create_from_model_path(model_path)
+# Cada pose tem 33 landmarks, guardados como (x, y, z, visibility)
+NUM_LANDMARKS = 33
+LANDMARK_FIELDS = 4
+
+# Landmark com a mesma interface (.x, .y, .z) dos landmarks do MediaPipe, usado pelo analisador
+Landmark = namedtuple('Landmark', ['x', 'y', 'z', 'visibility'])
+
+def empty_landmark_batch(batch_size, num_poses):
+    """
+    Cria o array (batch, poses, 33, 4) retornado pelos backends, preenchido com NaN.
+    Poses não detectadas permanecem com NaN.
+    """
+    return np.full((batch_size, num_poses, NUM_LANDMARKS, LANDMARK_FIELDS), np.nan, dtype=np.float32)
+
+def landmarks_from_array(poses):
+    """
+    Converte o array (poses, 33, 4) de um frame na lista de poses detectadas,
+    cada uma como uma lista de Landmark. Poses ausentes (NaN) são ignoradas.
+    """
+    return [
+        [Landmark(*lm) for lm in pose.tolist()]
+        for pose in poses
+        if not np.isnan(pose[0, 0])
+    ]
+
+class PoseBackend(Protocol):
+    """
+    Interface dos backends de detecção de pose usados pelo PersonalAI.
+    """
+    num_poses: int
+
+    def detect_batch(self, frames, timestamps):
+        """
+        Detecta as poses de uma lista de frames RGB com seus timestamps (ms).
+        Retorna um array float32 (len(frames), num_poses, 33, 4).
+        """
+        ...
+
+    def worker_factory(self):
+        """
+        Retorna uma função serializável (pickle) que cria um backend equivalente
+        dentro de outro processo, usada no processamento paralelo do vídeo.
+        """
+        ...
 
-    def detect(self, image): 
+    def close(self):
+        ...
+
+class MediaPipePoseBackend:
+    def __init__(self, model_path, num_poses=1):
+        # num_poses > 1 permite detectar vários atletas no mesmo frame
+        self.model_path = model_path
+        self.num_poses = num_poses
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.IMAGE,
+            num_poses=num_poses
+        )
+        self._landmarker = vision.PoseLandmarker.create_from_options(options)
+
+    def detect(self, image):
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
 
         # Realiza a detecção de pose
         return self._landmarker.detect(mp_image)
 
+    def _fill(self, out, image):
+        res = self.detect(image)
+        for p, pose in enumerate(res.pose_landmarks[:self.num_poses]):
+            out[p] = [(l.x, l.y, l.z, l.visibility or 0.0) for l in pose]
+
+    def detect_batch(self, frames, timestamps):
+        out = empty_landmark_batch(len(frames), self.num_poses)
+        for i, image in enumerate(frames):
+            self._fill(out[i], image)
+        return out
+
+    def worker_factory(self):
+        return partial(MediaPipePoseBackend, self.model_path, self.num_poses)
+
+    def close(self):
+        self._landmarker.close()
+
+# Nome mantido para o código que já usa o detector do MediaPipe diretamente
+PoseDetector = MediaPipePoseBackend
+
+class BatchedCpuPoseBackend:
+    def __init__(self, model_path, num_poses=1, workers=None):
+        """
+        Backend para processamentos offline: divide cada lote de frames entre várias
+        instâncias do PoseLandmarker, executadas em paralelo em threads
+        (a inferência do MediaPipe roda em C++ e não fica presa ao GIL).
+
+        Args:
+            model_path (str): Caminho do modelo .task do MediaPipe.
+            num_poses (int): Número máximo de poses por frame.
+            workers (int): Número de instâncias em paralelo. Padrão: número de CPUs.
+        """
+        self.model_path = model_path
+        self.num_poses = num_poses
+        self.workers = workers or os.cpu_count() or 1
+        self._detectors = [MediaPipePoseBackend(model_path, num_poses) for _ in range(self.workers)]
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def _detect_slice(self, detector, frames, out):
+        for i, image in enumerate(frames):
+            detector._fill(out[i], image)
+
+    def detect_batch(self, frames, timestamps):
+        out = empty_landmark_batch(len(frames), self.num_poses)
+        # Cada instância recebe uma fatia contígua do lote e escreve direto no array de saída
+        step = -(-len(frames) // self.workers)
+        futures = [
+            self._executor.submit(self._detect_slice, detector, frames[start:start + step], out[start:start + step])
+            for detector, start in zip(self._detectors, range(0, len(frames), step))
+        ]
+        for future in futures:
+            future.result()
+        return out
+
+    def worker_factory(self):
+        # No processamento paralelo cada processo já é um worker: basta uma instância por processo
+        return partial(MediaPipePoseBackend, self.model_path, self.num_poses)
+
+    def close(self):
+        self._executor.shutdown()
+        for detector in self._detectors:
+            detector.close()
+
+class ReplayPoseBackend:
+    def __init__(self, landmarks):
+        """
+        Backend que devolve landmarks gravados anteriormente (ver PersonalAI.save_landmarks),
+        na ordem dos frames. Permite testar e medir o pipeline completo sem arquivo de modelo.
+
+        Args:
+            landmarks (str | np.ndarray): Caminho de um arquivo .npy ou array (frames, poses, 33, 4).
+        """
+        if isinstance(landmarks, str):
+            landmarks = np.load(landmarks)
+        self.landmarks = np.asarray(landmarks, dtype=np.float32)
+        self.num_poses = self.landmarks.shape[1]
+        self._cursor = 0
+
+    def detect_batch(self, frames, timestamps):
+        out = empty_landmark_batch(len(frames), self.num_poses)
+        recorded = self.landmarks[self._cursor:self._cursor + len(frames)]
+        out[:len(recorded)] = recorded
+        self._cursor += len(frames)
+        return out
+
+    def seek(self, frame_index):
+        """
+        Posiciona a reprodução no frame informado (índice a partir de 0).
+        """
+        self._cursor = frame_index
+
+    def worker_factory(self):
+        return partial(ReplayPoseBackend, self.landmarks)
+
     def close(self):
-        self._landmarker.close()
\ No newline at end of file
+        pass
@@ -0,0 +1,69 @@
+import math
+
+class PoseTracker:
+    # Ombros e quadris: pontos mais estáveis para identificar a posição do atleta no frame
+    TORSO_LANDMARKS = (11, 12, 23, 24)
+
+    def __init__(self, max_tracks=1, max_distance=0.15):
+        """
+        Associa as poses detectadas em cada frame a identidades estáveis (atletas),
+        comparando a posição do tronco com a última posição conhecida de cada atleta.
+
+        Args:
+            max_tracks (int): Número máximo de atletas acompanhados no vídeo.
+            max_distance (float): Distância máxima (coordenadas normalizadas) para considerar
+                                  que a pose detectada é do mesmo atleta do frame anterior.
+        """
+        self.max_tracks = max_tracks
+        self.max_distance = max_distance
+
+        # id do atleta -> última posição (x, y) conhecida do tronco
+        self.track_positions = {}
+
+    def _torso_center(self, landmarks):
+        x = sum(landmarks[i].x for i in self.TORSO_LANDMARKS) / len(self.TORSO_LANDMARKS)
+        y = sum(landmarks[i].y for i in self.TORSO_LANDMARKS) / len(self.TORSO_LANDMARKS)
+        return x, y
+
+    def update(self, poses):
+        """
+        Recebe a lista de poses detectadas no frame e retorna um dicionário
+        {id do atleta: landmarks} apenas com os atletas encontrados neste frame.
+        """
+        poses = [p for p in (poses or []) if p]
+        centers = [self._torso_center(p) for p in poses]
+        assignments = {}
+
+        # 1. Associa cada pose ao atleta mais próximo, dentro da distância máxima
+        candidates = sorted(
+            (math.dist(centers[i], pos), track_id, i)
+            for track_id, pos in self.track_positions.items()
+            for i in range(len(poses))
+        )
+        used_poses = set()
+        for distance, track_id, i in candidates:
+            if distance > self.max_distance:
+                break
+            if track_id in assignments or i in used_poses:
+                continue
+            assignments[track_id] = i
+            used_poses.add(i)
+
+        # 2. Poses restantes viram novos atletas (da esquerda para a direita) enquanto houver vaga;
+        # sem vaga, são associadas ao atleta não encontrado mais próximo (reidentificação)
+        remaining = sorted((i for i in range(len(poses)) if i not in used_poses), key=lambda i: centers[i][0])
+        for i in remaining:
+            if len(self.track_positions) < self.max_tracks:
+                track_id = len(self.track_positions) + 1
+            else:
+                free_tracks = [t for t in self.track_positions if t not in assignments]
+                if not free_tracks:
+                    break
+                track_id = min(free_tracks, key=lambda t: math.dist(centers[i], self.track_positions[t]))
+            self.track_positions[track_id] = centers[i]
+            assignments[track_id] = i
+
+        for track_id, i in assignments.items():
+            self.track_positions[track_id] = centers[i]
+
+        return {track_id: poses[i] for track_id, i in sorted(assignments.items())}
@@ -0,0 +1,125 @@
+import numpy as np
+
+# Fases do SquatRepetitionAnalyzer em que a repetição está em andamento
+REP_PHASES = ('descendo', 'subindo')
+
+class RepKinematicsTracker:
+    def __init__(self):
+        """
+        Calcula a cinemática de cada repetição de forma incremental, com trabalho e memória
+        constantes por frame, a partir da fase detectada pelo SquatRepetitionAnalyzer.
+
+        Para cada repetição concluída guarda:
+            max_depth: maior descida da orelha em relação à posição inicial (coordenada normalizada).
+            eccentric_ms / concentric_ms: duração da descida e da subida.
+            time_under_tension_ms: duração total da repetição.
+            ear_peak_velocity / ear_mean_velocity e hip_peak_velocity / hip_mean_velocity:
+                velocidade vertical (em módulo) da orelha e do quadril, em alturas da imagem por segundo.
+        """
+        self.reps = []
+        self._last_phase = None
+        self._prev = None
+        self._active = False
+
+    def _start_rep(self, ts, baseline_ear_y):
+        self._active = True
+        self._baseline = baseline_ear_y
+        self._start_ts = ts
+        self._bottom_ts = None
+        self._max_ear_y = -np.inf
+        self._samples = 0
+        self._ear_sum = self._hip_sum = 0.0
+        self._ear_peak = self._hip_peak = 0.0
+
+    def update(self, phase, ts, ear_y, hip_y, baseline_ear_y):
+        """
+        Processa um frame já analisado: fase atual, timestamp (ms) e posições verticais normalizadas.
+        """
+        if phase == 'descendo' and self._last_phase != 'descendo':
+            self._start_rep(ts, baseline_ear_y)
+
+        if self._active:
+            self._max_ear_y = max(self._max_ear_y, ear_y)
+            if self._prev is not None and ts > self._prev[0]:
+                dt = (ts - self._prev[0]) / 1000
+                ear_v = abs(ear_y - self._prev[1]) / dt
+                hip_v = abs(hip_y - self._prev[2]) / dt
+                self._samples += 1
+                self._ear_sum += ear_v
+                self._hip_sum += hip_v
+                self._ear_peak = max(self._ear_peak, ear_v)
+                self._hip_peak = max(self._hip_peak, hip_v)
+
+            if phase == 'subindo' and self._bottom_ts is None:
+                self._bottom_ts = ts
+            elif phase not in REP_PHASES:
+                # Saiu da subida: a repetição foi concluída neste frame
+                self.reps.append(_rep_metrics(
+                    self._start_ts, self._bottom_ts, ts, self._max_ear_y - self._baseline,
+                    self._ear_peak, self._ear_sum / max(self._samples, 1),
+                    self._hip_peak, self._hip_sum / max(self._samples, 1)
+                ))
+                self._active = False
+
+        self._prev = (ts, ear_y, hip_y)
+        self._last_phase = phase
+
+def _rep_metrics(start_ts, bottom_ts, end_ts, max_depth, ear_peak, ear_mean, hip_peak, hip_mean):
+    bottom_ts = end_ts if bottom_ts is None else bottom_ts
+    return {
+        'max_depth': round(float(max_depth), 4),
+        'eccentric_ms': int(round(bottom_ts - start_ts)),
+        'concentric_ms': int(round(end_ts - bottom_ts)),
+        'time_under_tension_ms': int(round(end_ts - start_ts)),
+        'ear_peak_velocity': round(float(ear_peak), 4),
+        'ear_mean_velocity': round(float(ear_mean), 4),
+        'hip_peak_velocity': round(float(hip_peak), 4),
+        'hip_mean_velocity': round(float(hip_mean), 4)
+    }
+
+def compute_rep_kinematics(ts, ear_y, hip_y, phases, baseline_ear_y):
+    """
+    Equivalente vetorizado do RepKinematicsTracker para dados offline.
+
+    Args:
+        ts, ear_y, hip_y (array-like): Timestamp (ms) e posições verticais de cada frame após a calibração.
+        phases (array-like): Fase do SquatRepetitionAnalyzer em cada frame.
+        baseline_ear_y (float): Posição inicial da orelha (ear_y_inicial).
+
+    Retorna a lista de métricas das repetições concluídas, no mesmo formato de RepKinematicsTracker.reps.
+    """
+    ts = np.asarray(ts, dtype=np.float64)
+    ear_y = np.asarray(ear_y, dtype=np.float64)
+    hip_y = np.asarray(hip_y, dtype=np.float64)
+    phases = np.asarray(phases)
+    if len(ts) == 0:
+        return []
+
+    prev_phases = np.concatenate([[None], phases[:-1]])
+    in_rep = np.isin(phases, REP_PHASES)
+    starts = np.flatnonzero((phases == 'descendo') & (prev_phases != 'descendo'))
+    ends = np.flatnonzero((prev_phases == 'subindo') & ~in_rep)
+
+    # Velocidade de cada frame em relação ao anterior (frames com mesmo timestamp são ignorados)
+    dt = np.diff(ts, prepend=np.nan) / 1000
+    valid = dt > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ear_v = np.abs(np.diff(ear_y, prepend=np.nan)) / dt
+        hip_v = np.abs(np.diff(hip_y, prepend=np.nan)) / dt
+
+    reps = []
+    for start in starts:
+        later_ends = ends[ends > start]
+        if len(later_ends) == 0:
+            break
+        end = later_ends[0]
+        rep = slice(start, end + 1)
+        samples = valid[rep]
+        bottoms = np.flatnonzero(phases[rep] == 'subindo')
+        reps.append(_rep_metrics(
+            ts[start], ts[start + bottoms[0]] if len(bottoms) else None, ts[end],
+            ear_y[rep].max() - baseline_ear_y,
+            ear_v[rep][samples].max(initial=0.0), ear_v[rep][samples].mean() if samples.any() else 0.0,
+            hip_v[rep][samples].max(initial=0.0), hip_v[rep][samples].mean() if samples.any() else 0.0
+        ))
+    return reps
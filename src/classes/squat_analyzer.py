@@ -2,6 +2,8 @@ import math
 import numpy as np
 from mediapipe import solutions
 
+from .rep_kinematics import RepKinematicsTracker
+
 class SquatRepetitionAnalyzer:
     def __init__(self, 
                  descent_threshold=0.05, 
@@ -9,8 +11,10 @@ class SquatRepetitionAnalyzer:
                  trunk_error_threshold=5, # O erro só é contado se ocorrer por 5 frames seguidos
                  knee_error_threshold=5,
                  head_error_threshold=5,
-                 foot_error_threshold=5):
+                 foot_error_threshold=5,
+                 repetition_target=3): # Número de repetições da série; a análise termina ao atingi-lo
         
+        self.REPETITION_TARGET = repetition_target
         self.DESCENT_THRESHOLD = descent_threshold 
         self.ASCENT_RETURN_THRESHOLD = ascent_return_threshold 
         self.TRUNK_ERROR_THRESHOLD = trunk_error_threshold
@@ -40,6 +44,7 @@ class SquatRepetitionAnalyzer:
         self.consecutive_knee_error_counter = 0
         self.consecutive_head_error_counter = 0
         self.consecutive_foot_error_counter = 0
+        self.consecutive_valgus_error_counter = 0
 
         # Contadores de ERROS TOTAIS para a repetição atual
         self.total_trunk_error_counter = 0
@@ -58,12 +63,18 @@ class SquatRepetitionAnalyzer:
 
         # Lista para armazenar os timestamps de finalização de cada repetição
         self.repetition_timestamps = []
+
+        # Cinemática (profundidade, tempos e velocidades) de cada repetição concluída
+        self.kinematics = RepKinematicsTracker()
         
-    def process_frame_landmarks(self, landmarks_obj, timestamp_ms): 
+    def process_frame_landmarks(self, landmarks_obj, timestamp_ms, view_landmarks=None): 
         """ hp: Significa Head Posture (Postura da Cabeça).
             tr: Significa Trunk (Tronco).
             hl: Significa Heel Lift (Elevação do Calcanhar).
-            kn: Significa Knee (Joelho)."""
+            kn: Significa Knee (Joelho).
+
+            landmarks_obj vem da câmera sagital, que define as fases da repetição.
+            view_landmarks: landmarks de outras câmeras alinhadas a este frame ({'frontal': ...})."""
         
         hp = tr = hl = kn = 0 
         
@@ -73,14 +84,19 @@ class SquatRepetitionAnalyzer:
 
         ear_y = landmarks_obj[solutions.pose.PoseLandmark.RIGHT_EAR].y
         heel_y = landmarks_obj[solutions.pose.PoseLandmark.RIGHT_HEEL].y 
+        hip_y = landmarks_obj[solutions.pose.PoseLandmark.RIGHT_HIP].y
         
-        self._detect_repetition_phase(ear_y, heel_y, timestamp_ms)
+        self._detect_repetition_phase(ear_y, heel_y, timestamp_ms, hip_y)
         
         hp, tr, hl, kn = self._check_errors(landmarks_obj) 
         
+        # Verificações que só podem ser feitas pelas outras câmeras
+        if view_landmarks:
+            kn = max(kn, self._check_view_errors(view_landmarks))
+        
         return hp, tr, hl, kn 
 
-    def _detect_repetition_phase(self, ear_y, heel_y, ts):
+    def _detect_repetition_phase(self, ear_y, heel_y, ts, hip_y=None):
         if self.ear_y_inicial is None and self.heel_y_inicial is None and self.knee_x_inicial is None and self.ankle_x_inicial is None: # Se ainda não calibramos a posição inicial
             if len(self.ear_y_history) >= 10 and len(self.heel_y_history) >= 10 and len(self.knee_x_history) >= 10 and len(self.ankle_x_history) >= 10: # Se já coletamos 10 ou mais pontos
                 self.ear_y_inicial = np.mean(self.ear_y_history[-10:])
@@ -114,10 +130,21 @@ class SquatRepetitionAnalyzer:
                 self.current_phase = 'final'
                 self._complete_repetition(ts)
                 
-                if self.repetitions_detected < 3: 
+                if self.repetitions_detected < self.REPETITION_TARGET: 
                     self.current_phase = 'inicial'
                     self.min_y_in_rep = None
 
+        if hip_y is not None:
+            self.kinematics.update(self.current_phase, ts, ear_y, hip_y, self.ear_y_inicial)
+
+    @property
+    def analysis_complete(self):
+        """
+        True quando a meta de repetições foi atingida. A partir daí nenhum frame
+        novo altera o resultado, então o processamento do vídeo pode ser encerrado.
+        """
+        return self.repetitions_detected >= self.REPETITION_TARGET
+
     def create_dictionary_landmarks(self, lm_obj):
         """
         Extrai as coordenadas das landmarks essenciais e as armazena em um dicionário.
@@ -311,12 +338,62 @@ class SquatRepetitionAnalyzer:
          
         return hp_status, tr_status, hl_status, kn_status
 
+    def _check_knee_valgus_error(self, lm_obj):
+        """
+        Verifica o valgo dinâmico do joelho (joelho desviando para dentro) na câmera frontal.
+        O erro é contado como erro de joelho da repetição, usando a mesma tolerância de duração.
+
+        Para cada perna, compara a posição horizontal do joelho com a linha entre quadril e
+        tornozelo na altura do joelho. Um deslocamento em direção à linha média do corpo maior
+        que uma fração da largura do quadril é considerado valgo.
+        """
+        kn_status = 0
+        try:
+            TOLERANCIA_VALGO = 0.15 # Fração da largura do quadril
+            
+            hip_width = abs(lm_obj[23].x - lm_obj[24].x)
+            midline_x = (lm_obj[23].x + lm_obj[24].x) / 2
+            valgus = False
+            for hip, knee, ankle in [(23, 25, 27), (24, 26, 28)]:
+                # Posição x esperada do joelho sobre a linha quadril-tornozelo
+                t = (lm_obj[knee].y - lm_obj[hip].y) / (lm_obj[ankle].y - lm_obj[hip].y)
+                expected_x = lm_obj[hip].x + t * (lm_obj[ankle].x - lm_obj[hip].x)
+                # Positivo quando o joelho está mais perto da linha média do que o esperado
+                medial_shift = abs(expected_x - midline_x) - abs(lm_obj[knee].x - midline_x)
+                if medial_shift > TOLERANCIA_VALGO * hip_width:
+                    valgus = True
+
+            if valgus:
+                self.consecutive_valgus_error_counter += 1
+                kn_status = 1
+            else:
+                self.consecutive_valgus_error_counter = 0
+
+            if self.consecutive_valgus_error_counter >= self.KNEE_ERROR_THRESHOLD:
+                self.total_knee_error_counter += 1
+                self.consecutive_valgus_error_counter = 0
+        except Exception as e:
+            print(f"Erro específico no cálculo do valgo do joelho (câmera frontal): {e}")
+            self.consecutive_valgus_error_counter = 0
+        return kn_status
+
+    def _check_view_errors(self, view_landmarks):
+        """
+        Verifica os erros vistos pelas câmeras adicionais, nas mesmas fases das demais verificações.
+        Retorna o status de erro de joelho (0 ou 1) deste frame.
+        """
+        kn_status = 0
+        if self.current_phase in ['descendo', 'subindo'] and view_landmarks.get('frontal'):
+            kn_status = self._check_knee_valgus_error(view_landmarks['frontal'])
+        return kn_status
+
     def _reset_error_counters(self):
         # Reseta os contadores CONSECUTIVOS e TOTAIS para a nova repetição
         self.consecutive_trunk_error_counter = 0
         self.consecutive_knee_error_counter = 0
         self.consecutive_head_error_counter = 0
         self.consecutive_foot_error_counter = 0
+        self.consecutive_valgus_error_counter = 0
 
         self.total_trunk_error_counter = 0
         self.total_knee_error_counter = 0
@@ -324,7 +401,7 @@ class SquatRepetitionAnalyzer:
         self.total_foot_error_counter = 0
 
     def _complete_repetition(self, current_ts):
-        if self.repetitions_detected < 3: 
+        if self.repetitions_detected < self.REPETITION_TARGET: 
             # O resultado da repetição é 1 se o erro ocorreu pelo menos uma vez
             trunk_rep_result = 1 if self.total_trunk_error_counter > 0 else 0
             knee_rep_result = 1 if self.total_knee_error_counter > 0 else 0
@@ -348,7 +425,7 @@ class SquatRepetitionAnalyzer:
     def finalize_analysis(self):  
         if self.repetitions_detected == 0 and self.current_phase != 'inicial':
             print("Nenhuma repetição completa detectada neste vídeo. Preenchendo slots com 0.")
-            for i in range(3):
+            for i in range(self.REPETITION_TARGET):
                 for key in ['head', 'trunk', 'heel', 'knee']:
                     self.reps[key].append(0)
                 self.repetition_timestamps.append(None)
@@ -359,10 +436,10 @@ class SquatRepetitionAnalyzer:
                 print(f"  Slot para Repetição {i+1} preenchido com 0.")
         else:
             num_detected = self.repetitions_detected
-            if num_detected < 3:
+            if num_detected < self.REPETITION_TARGET:
                 print(f"{num_detected} repetição(ões) completa(s) detectada(s). Preenchendo slots restantes com 0.")
             
-            for i in range(num_detected, 3): 
+            for i in range(num_detected, self.REPETITION_TARGET): 
                 for key in ['head', 'trunk', 'heel', 'knee']:
                     self.reps[key].append(0) 
                 self.repetition_timestamps.append(None)
@@ -371,3 +448,24 @@ class SquatRepetitionAnalyzer:
                 self.head_error_history.append(0)
                 self.foot_error_history.append(0)
                 print(f"  Slot para Repetição {i+1} preenchido com 0.")
+
+    def repetition_summary(self):
+        """
+        Retorna os dados de cada repetição (inclusive os slots não detectados) como
+        uma lista de dicionários serializáveis em JSON.
+        """
+        summary = []
+        for i in range(len(self.reps['trunk'])):
+            summary.append({
+                'repetition': i + 1,
+                'completed_at_s': self.repetition_timestamps[i],
+                'deviations': {key: self.reps[key][i] for key in ['head', 'trunk', 'heel', 'knee']},
+                'kinematics': self.kinematics.reps[i] if i < len(self.kinematics.reps) else None,
+                'error_counts': {
+                    'head': self.head_error_history[i],
+                    'trunk': self.trunk_error_history[i],
+                    'heel': self.foot_error_history[i],
+                    'knee': self.knee_error_history[i]
+                }
+            })
+        return summary
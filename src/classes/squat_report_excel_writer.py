@@ -14,12 +14,20 @@ class SquatReportExcelWriter:
         """
         self.person_name = person_name
         self.analyzer = squat_analyzer_instance 
-        
+        # O relatório tem uma coluna por repetição da meta definida no analisador
+        self.num_repetitions = squat_analyzer_instance.REPETITION_TARGET
+
+    def _padded(self, values):
+        # Completa (ou corta) a lista até o número de repetições, substituindo valores ausentes por 0
+        values = (list(values) + [None] * self.num_repetitions)[:self.num_repetitions]
+        return [(val if val is not None else 0) for val in values]
+
     def _fill_repetition_data(self, df_report):
         """
-        Preenche as colunas 'Repetição 1', 'Repetição 2', 'Repetição 3' e 'Resultado'
+        Preenche as colunas 'Repetição 1' ... 'Repetição N' e 'Resultado'
         no DataFrame do relatório, usando os dados de self.analyzer.reps.
         Se os dados de uma parte do corpo estiverem ausentes, as células correspondentes serão preenchidas com 0.
+        O resultado é 1 quando o desvio aparece na maioria das repetições da meta.
 
         Args:
             df_report (pd.DataFrame): O DataFrame do relatório a ser preenchido.
@@ -43,47 +51,32 @@ class SquatReportExcelWriter:
             reps_status = self.analyzer.reps.get(internal_key, [])
             
             # Preenche os dados de repetição, substituindo valores ausentes por 0
-            padded_reps_status = [(val if val is not None else 0) for val in (reps_status + [None, None, None])[:3]]
+            padded_reps_status = self._padded(reps_status)
 
-            df_report.loc[index, 'Repetição 1'] = padded_reps_status[0]
-            df_report.loc[index, 'Repetição 2'] = padded_reps_status[1]
-            df_report.loc[index, 'Repetição 3'] = padded_reps_status[2]
+            for rep, status in enumerate(padded_reps_status, start=1):
+                df_report.loc[index, f'Repetição {rep}'] = status
             
-            # O resultado é calculado com base nos dados preenchidos
-            resultado = 1 if sum(padded_reps_status) >= 2 else 0
+            # O resultado é calculado com base nos dados preenchidos (maioria das repetições)
+            resultado = 1 if sum(padded_reps_status) >= self.num_repetitions // 2 + 1 else 0
             df_report.loc[index, 'Resultado'] = resultado
 
 
-    def generate_report(self): 
+    def build_report(self):
         """
-        Gera o relatório Excel completo com os dados da análise.
+        Monta o DataFrame do relatório com os dados da análise, sem salvá-lo.
         """
-        # 1. Define os cabeçalhos da planilha na ordem CORRETA.
-        columns = [
-            'Partes do corpo',
-            'Número de erros Repetição 01',
-            'Número de erros Repetição 02',
-            'Número de erros Repetição 03',
-            'Repetição 1',
-            'Repetição 2',
-            'Repetição 3',
-            'Resultado'
-        ]
+        # 1. Define os cabeçalhos da planilha na ordem CORRETA (uma coluna de cada tipo por repetição da meta).
+        repetitions = range(1, self.num_repetitions + 1)
+        error_count_columns = [f'Número de erros Repetição {rep:02d}' for rep in repetitions]
+        status_columns = [f'Repetição {rep}' for rep in repetitions]
+        columns = ['Partes do corpo'] + error_count_columns + status_columns + ['Resultado']
 
         # 2. Define os dados para a coluna 'Partes do corpo'
         body_parts_data = ['Cabeça', 'Tronco', 'Joelho', 'Pé']
 
         # 3. Prepara um dicionário com os dados iniciais.
-        data_for_df = {
-            'Partes do corpo': body_parts_data,
-            'Número de erros Repetição 01': [None] * len(body_parts_data),
-            'Número de erros Repetição 02': [None] * len(body_parts_data),
-            'Número de erros Repetição 03': [None] * len(body_parts_data),
-            'Repetição 1': [None] * len(body_parts_data),
-            'Repetição 2': [None] * len(body_parts_data),
-            'Repetição 3': [None] * len(body_parts_data),
-            'Resultado': [None] * len(body_parts_data)
-        }
+        data_for_df = {column: [None] * len(body_parts_data) for column in columns}
+        data_for_df['Partes do corpo'] = body_parts_data
 
         # 4. Cria o DataFrame Pandas
         df_report = pd.DataFrame(data_for_df, columns=columns)
@@ -106,28 +99,54 @@ class SquatReportExcelWriter:
                 error_counts = getattr(self.analyzer, internal_key, [])
                 
                 # Preenche os dados de contagem de erros, substituindo valores ausentes por 0
-                padded_error_counts = [(val if val is not None else 0) for val in (error_counts + [None, None, None])[:3]]
-
-                df_report.loc[index, 'Número de erros Repetição 01'] = padded_error_counts[0]
-                df_report.loc[index, 'Número de erros Repetição 02'] = padded_error_counts[1]
-                df_report.loc[index, 'Número de erros Repetição 03'] = padded_error_counts[2]
+                for column, count in zip(error_count_columns, self._padded(error_counts)):
+                    df_report.loc[index, column] = count
             else:
                 print(f"DEBUG: Dados de histórico de erros não encontrados para '{parte_display_name}'.")
 
         # 7. Chama a função para preencher os dados de status (0 ou 1) de repetição e resultado.
         self._fill_repetition_data(df_report)
+        return df_report
+
+    def build_kinematics_report(self):
+        """
+        Monta o DataFrame com a cinemática de cada repetição concluída
+        (profundidade, tempos e velocidades calculados pelo RepKinematicsTracker).
+        """
+        columns = {
+            'max_depth': 'Profundidade máxima',
+            'eccentric_ms': 'Fase excêntrica (ms)',
+            'concentric_ms': 'Fase concêntrica (ms)',
+            'time_under_tension_ms': 'Tempo sob tensão (ms)',
+            'ear_peak_velocity': 'Velocidade pico orelha',
+            'ear_mean_velocity': 'Velocidade média orelha',
+            'hip_peak_velocity': 'Velocidade pico quadril',
+            'hip_mean_velocity': 'Velocidade média quadril'
+        }
+        df_kinematics = pd.DataFrame(self.analyzer.kinematics.reps, columns=list(columns)).rename(columns=columns)
+        df_kinematics.insert(0, 'Repetição', range(1, len(df_kinematics) + 1))
+        return df_kinematics
+
+    def generate_report(self): 
+        """
+        Gera o relatório Excel completo com os dados da análise.
+        """
+        df_report = self.build_report()
+        df_kinematics = self.build_kinematics_report()
 
-        # 8. Cria a pasta 'planilhas' se ela não existir
+        # Cria a pasta 'planilhas' se ela não existir
         output_folder = 'planilhas'
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
 
-        # 9. Define o caminho completo do arquivo
+        # Define o caminho completo do arquivo
         file_path = os.path.join(output_folder, f"{self.person_name}.xlsx")
 
-        # 10. Salva o DataFrame no arquivo Excel
+        # Salva o DataFrame no arquivo Excel
         try:
-            df_report.to_excel(file_path, index=False)
+            with pd.ExcelWriter(file_path) as writer:
+                df_report.to_excel(writer, index=False)
+                df_kinematics.to_excel(writer, sheet_name='Cinemática', index=False)
             st.success(f"Relatório de análise salvo com sucesso em '{file_path}'!")
         except Exception as e:
             st.error(f"Erro ao salvar o relatório Excel: {e}")
@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
 import os
+import shutil
 
 from classes.personal_ai import PersonalAI
 from ultils.feedback_messages import feedback_messages
 from classes.squat_report_excel_writer import SquatReportExcelWriter
+from classes.deviation_clip_exporter import DeviationClipExporter
 
 MODEL_PATH = 'models/pose_landmarker_full.task'
 
@@ -18,6 +20,7 @@ def setup_app_ui():
     st.title('Análise Sagital Direita - Agachamento')
     name_input = st.text_input('Nome da pessoa')
     uploaded_file = st.file_uploader('Envie o vídeo (Sagital Direita)', type=['mp4', 'avi', 'mov'])
+    frontal_file = st.file_uploader('Vídeo frontal da mesma série (opcional)', type=['mp4', 'avi', 'mov'], help="Gravado ao mesmo tempo que o vídeo sagital. Permite verificar se os joelhos desviam para dentro (valgo). Disponível apenas com um único atleta no vídeo.")
 
     st.write('### Parâmetros de Avaliação do Exercício')
     col_param1, col_param2 = st.columns(2)
@@ -29,6 +32,10 @@ def setup_app_ui():
         ascent_return_th = st.slider('Tolerância de Retorno na Subida (Repetição)', 0.005, 0.05, 0.02, 0.005, format='%.3f', help="Percentual de proximidade da posição inicial da orelha para finalizar a contagem da repetição.")
         knee_err_th = st.slider('Tolerância de Desvio - Joelho (Duração Permitida)', 1, 90, 13, 1, help="Número de instantes que o joelho pode estar desalinhado antes de ser considerado um erro na repetição.")
         foot_err_th = st.slider('Tolerância de Desvio - Calcanhar (Duração Permitida)', 1, 90, 69, 1, help="Número de instantes que o calcanhar pode estar levantado antes de ser considerado um erro na repetição.")
+    parallel = st.checkbox('Processamento paralelo', help="Divide o vídeo entre os núcleos do processador. Mais rápido em vídeos longos, mas sem a visualização dos frames durante a análise.")
+    export_clips = st.checkbox('Exportar clipes dos desvios', help="Salva um clipe curto, com o esqueleto desenhado, de cada momento em que um desvio foi sinalizado.")
+    repetition_target = st.number_input('Número de repetições da série', 1, 10, 3, 1, help="A análise é encerrada assim que essa quantidade de repetições é detectada, sem processar o restante do vídeo.")
+    num_athletes = st.number_input('Número de atletas no vídeo', 1, 4, 1, 1, help="Quantidade de pessoas agachando lado a lado no vídeo. Cada atleta recebe sua própria análise e relatório.")
 
     params = {
         'descent_threshold': descent_th,
@@ -36,11 +43,18 @@ def setup_app_ui():
         'trunk_error_threshold': trunk_err_th,
         'knee_error_threshold': knee_err_th,
         'head_error_threshold': head_err_th,
-        'foot_error_threshold': foot_err_th
+        'foot_error_threshold': foot_err_th,
+        'num_poses': int(num_athletes),
+        'repetition_target': int(repetition_target)
     }
-    return name_input, uploaded_file, params
+    options = {
+        'parallel': parallel,
+        'export_clips': export_clips,
+        'frontal_file': frontal_file
+    }
+    return name_input, uploaded_file, params, options
 
-def process_and_analyze_video(uploaded_file, name_input, params):
+def process_and_analyze_video(uploaded_file, name_input, params, options):
     """
     Salva o vídeo temporariamente, inicializa a IA e processa o vídeo.
     Retorna a instância do PersonalAI após a análise.
@@ -50,26 +64,62 @@ def process_and_analyze_video(uploaded_file, name_input, params):
     # Cria um nome de arquivo temporário
     temp_path = f'temp_sag_dir{ext}'
 
-    # Salva o conteúdo do arquivo enviado em disco
+    # Salva o conteúdo do arquivo enviado em disco, em blocos
     with open(temp_path, 'wb') as f:
-        f.write(uploaded_file.getbuffer())
+        shutil.copyfileobj(uploaded_file, f)
+
+    # O vídeo frontal, se enviado, é analisado junto com o sagital
+    extra_views = {}
+    if options['frontal_file']:
+        extra_views['frontal'] = f"temp_frontal{os.path.splitext(options['frontal_file'].name)[1]}"
+        with open(extra_views['frontal'], 'wb') as f:
+            shutil.copyfileobj(options['frontal_file'], f)
     st.info('Analisando vídeo...')
 
     # Inicializa a classe PersonalAI com os parâmetros do usuário
     ai = PersonalAI(
         temp_path, name_input, MODEL_PATH,
+        extra_views=extra_views,
         **params # Desempacota o dicionário de parâmetros
     )
-    # Processa o vídeo. draw=True e display=True são para visualização durante o processo.
-    ai.process_video(True, True) 
+    if options['parallel']:
+        ai.process_video_parallel()
+    else:
+        # Processa o vídeo. draw=True e display=True são para visualização durante o processo.
+        ai.process_video(True, True) 
     st.success('Análise concluída!')
+    for view_name, error in ai.view_errors.items():
+        st.warning(f"A câmera '{view_name}' não pôde ser analisada e as verificações dela não foram feitas: {error}")
+    if ai.frames_skipped:
+        st.info(f"Meta de repetições atingida: {ai.frames_skipped} frame(s) restantes do vídeo não precisaram ser processados.")
 
-    excel_writer = SquatReportExcelWriter(name_input, ai.squat_analyzer)
-    excel_writer.generate_report()     
+    # Um relatório por atleta acompanhado no vídeo
+    for athlete_id, session in ai.sessions.items():
+        excel_writer = SquatReportExcelWriter(athlete_display_name(ai, name_input, athlete_id), session.squat_analyzer)
+        excel_writer.generate_report()     
+
+    # Os clipes são gerados antes de remover o vídeo temporário
+    if options['export_clips']:
+        clip_exporter = DeviationClipExporter(ai)
+        for athlete_id, session in ai.sessions.items():
+            paths = clip_exporter.export(session, athlete_display_name(ai, name_input, athlete_id))
+            if paths:
+                st.success(f"{len(paths)} clipe(s) de desvios salvos em '{clip_exporter.output_folder}'.")
     # Limpa o arquivo temporário após o processamento
     os.remove(temp_path)
+    for path in extra_views.values():
+        os.remove(path)
     return ai
 
+def athlete_display_name(ai, name, athlete_id):
+    """
+    Retorna o nome usado na tela e no relatório de um atleta.
+    Com um único atleta no vídeo, o nome informado é usado sem alterações.
+    """
+    if len(ai.sessions) == 1:
+        return name
+    return f"{name} - Atleta {athlete_id}"
+
 def display_overall_summary(ai_analyzer, name):
     """
     Exibe um resumo geral das repetições detectadas.
@@ -143,6 +193,14 @@ def display_repetition_details_and_feedback(ai_analyzer):
             st.markdown(f"- **Cabeça:** {head_status} ({ai_analyzer.head_error_history[i]} instantes)") 
             st.markdown(f"- **Calcanhar:** {heel_status} ({ai_analyzer.foot_error_history[i]} instantes)") 
 
+            # Cinemática da repetição (disponível apenas para repetições concluídas)
+            if i < len(ai_analyzer.kinematics.reps):
+                kin = ai_analyzer.kinematics.reps[i]
+                st.markdown(f"- **Tempo:** descida {kin['eccentric_ms'] / 1000:.2f} s, subida {kin['concentric_ms'] / 1000:.2f} s "
+                            f"(tempo sob tensão {kin['time_under_tension_ms'] / 1000:.2f} s)")
+                st.markdown(f"- **Profundidade máxima:** {kin['max_depth']:.3f} | **Velocidade do quadril:** "
+                            f"pico {kin['hip_peak_velocity']:.3f}, média {kin['hip_mean_velocity']:.3f} (alturas da imagem/s)")
+
             st.write("---") # Separador visual
             st.write("**Feedback para esta repetição:**")
             feedback_given = False
@@ -176,12 +234,24 @@ def display_no_repetitions_found_message():
     """
     st.write('Nenhuma repetição foi detectada com os parâmetros atuais. Por favor, verifique se o movimento de agachamento foi completo ou ajuste os parâmetros de sensibilidade.')
 
+def display_deviation_intervals(deviation_index):
+    """
+    Exibe os intervalos de tempo com desvios (os mesmos usados para exportar os clipes).
+    """
+    st.write('### Momentos com Desvios')
+    if deviation_index.intervals:
+        st.dataframe(deviation_index.to_dataframe(), use_container_width=True)
+    else:
+        st.info("Nenhum desvio sinalizado durante o vídeo.")
+    st.markdown("---") # Separador visual
+
 def display_data_frames(ai):
     """
     Exibe DataFrames detalhados de desvios ponto a ponto,
     convertendo a coluna de tempo para segundos.
     Assume que os DataFrames (ai.head_df, ai.trunk_df, etc.)
     possuem uma coluna de tempo que precisa ser convertida.
+    Aceita tanto o PersonalAI quanto a AthleteSession de um atleta.
     """
     st.write('### Detalhe da Análise Ponto a Ponto (Momentos de Desvio)')
 
@@ -213,20 +283,25 @@ def display_data_frames(ai):
         st.markdown("---") # Separador visual entre os DataFrames
 
 if __name__ == "__main__":
-    name_input, uploaded_file, params = setup_app_ui()
+    name_input, uploaded_file, params, options = setup_app_ui()
 
+    # O vídeo frontal só é associado corretamente quando há um único atleta
+    if options['frontal_file'] and params['num_poses'] > 1:
+        st.error('O vídeo frontal só pode ser usado com um único atleta no vídeo.')
     #Processa o vídeo se um arquivo for enviado e um nome for fornecido
-    if uploaded_file and name_input:
-        ai_instance = process_and_analyze_video(uploaded_file, name_input, params)
+    elif uploaded_file and name_input:
+        ai_instance = process_and_analyze_video(uploaded_file, name_input, params, options)
         
-        # Exibir o resumo geral
-        display_overall_summary(ai_instance.squat_analyzer, name_input)
-        
-        # Exibir gráficos detalhados e feedback se houver repetições
-        if ai_instance.squat_analyzer.repetitions_detected > 0:
-            display_detailed_charts(ai_instance.squat_analyzer)
-            display_repetition_details_and_feedback(ai_instance.squat_analyzer)
-            display_data_frames(ai_instance)
-        else:
-            display_no_repetitions_found_message()
+        for athlete_id, session in ai_instance.sessions.items():
+            # Exibir o resumo geral
+            display_overall_summary(session.squat_analyzer, athlete_display_name(ai_instance, name_input, athlete_id))
+            
+            # Exibir gráficos detalhados e feedback se houver repetições
+            if session.squat_analyzer.repetitions_detected > 0:
+                display_detailed_charts(session.squat_analyzer)
+                display_repetition_details_and_feedback(session.squat_analyzer)
+                display_deviation_intervals(session.deviation_index)
+                display_data_frames(session)
+            else:
+                display_no_repetitions_found_message()
 
@@ -0,0 +1,265 @@
+"""
+Serviço HTTP local para análise de agachamento, para uso por outros sistemas.
+
+Uso (a partir da pasta src):
+    python service.py --port 8080 --workers 2 --max-queue 8
+
+Endpoints:
+    POST /jobs?name=Fulano[&descent_threshold=0.05&...]  Corpo: o vídeo (enviado em streaming).
+                                                          Retorna 202 com o job_id, ou 429 se a fila estiver cheia.
+    GET  /jobs/{job_id}                                   Status do job (queued, running, done, failed).
+    GET  /jobs/{job_id}/result                            Dados por repetição de cada atleta, em JSON.
+    GET  /metrics                                         Profundidade da fila e taxas de processamento.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import cv2
+from aiohttp import web
+
+from classes.personal_ai import PersonalAI
+from classes.squat_report_excel_writer import SquatReportExcelWriter
+
+MODEL_PATH = 'models/pose_landmarker_full.task'
+
+# Parâmetros aceitos na query string de POST /jobs e seus tipos
+JOB_PARAMS = {
+    'descent_threshold': float,
+    'ascent_return_threshold': float,
+    'trunk_error_threshold': int,
+    'knee_error_threshold': int,
+    'head_error_threshold': int,
+    'foot_error_threshold': int,
+    'num_poses': int,
+    'batch_size': int,
+    'repetition_target': int
+}
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+# Quantidade de jobs finalizados mantidos em memória para consulta
+MAX_FINISHED_JOBS = 1000
+
+def check_video(video_path):
+    """
+    Verifica se o arquivo enviado é um vídeo com pelo menos um frame legível.
+    process_video trata os próprios erros, então um arquivo inválido precisa ser recusado antes.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            raise ValueError("O arquivo enviado não pôde ser aberto como vídeo.")
+        ret, _ = cap.read()
+        if not ret:
+            raise ValueError("Nenhum frame pôde ser lido do vídeo enviado.")
+    finally:
+        cap.release()
+
+def run_analysis(video_path, name, model_path, params):
+    """
+    Executado em um processo do pool: analisa o vídeo e retorna o resultado serializável em JSON.
+    """
+    start = time.perf_counter()
+    check_video(video_path)
+    ai = PersonalAI(video_path, name, model_path, **params)
+    ai.process_video(False, False)
+
+    athletes = []
+    for athlete_id, session in ai.sessions.items():
+        analyzer = session.squat_analyzer
+        report = SquatReportExcelWriter(name, analyzer).build_report()
+        athletes.append({
+            'athlete_id': athlete_id,
+            'repetitions_detected': analyzer.repetitions_detected,
+            'repetitions': analyzer.repetition_summary(),
+            'report': json.loads(report.to_json(orient='records', force_ascii=False)),
+            'deviation_intervals': [
+                dict(interval, parts=sorted(interval['parts'])) for interval in session.deviation_index.intervals
+            ]
+        })
+    return {
+        'name': name,
+        'frames': ai.frame,
+        'frames_skipped': ai.frames_skipped,
+        'processing_time_s': round(time.perf_counter() - start, 3),
+        'athletes': athletes
+    }
+
+class AnalysisService:
+    def __init__(self, model_path, workers, max_queue, upload_dir):
+        """
+        Args:
+            model_path (str): Modelo .task do MediaPipe usado pelos jobs.
+            workers (int): Número de vídeos analisados ao mesmo tempo (processos).
+            max_queue (int): Máximo de jobs aguardando um worker; acima disso, POST /jobs retorna 429.
+            upload_dir (str): Pasta para os vídeos recebidos enquanto aguardam a análise.
+        """
+        self.model_path = model_path
+        self.workers = workers
+        self.max_queue = max_queue
+        self.upload_dir = upload_dir
+
+        self.jobs = OrderedDict()
+        self.queued = 0
+        self.running = 0
+        self.counters = {'accepted': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+        # (instante de término, tempo de processamento) dos últimos jobs, para as taxas em /metrics
+        self.recent = deque(maxlen=1000)
+        self.started_at = time.time()
+
+        self._slots = None
+        self._executor = None
+        # Tarefas dos jobs em andamento; a referência evita que sejam coletadas antes de terminar
+        self._tasks = set()
+
+    async def on_startup(self, app):
+        self._slots = asyncio.Semaphore(self.workers)
+        # spawn evita herdar o estado do event loop e do MediaPipe nos processos de análise
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    async def on_cleanup(self, app):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # shutdown espera os processos terminarem: é executado fora do event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self._executor.shutdown, cancel_futures=True))
+
+    def _parse_params(self, query):
+        params = {}
+        for key, cast in JOB_PARAMS.items():
+            if key in query:
+                try:
+                    params[key] = cast(query[key])
+                except ValueError:
+                    raise web.HTTPBadRequest(text=f"Parâmetro inválido: {key}={query[key]}")
+        return params
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job['status'] in ('done', 'failed')]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def submit_job(self, request):
+        # A vaga na fila é reservada antes de ler o corpo, para recusar o upload o quanto antes
+        if self.queued >= self.max_queue:
+            self.counters['rejected'] += 1
+            raise web.HTTPTooManyRequests(text="Fila de análise cheia. Tente novamente mais tarde.", headers={'Retry-After': '5'})
+        name = request.query.get('name')
+        if not name:
+            raise web.HTTPBadRequest(text="Informe o nome da pessoa no parâmetro 'name'.")
+        params = self._parse_params(request.query)
+
+        self.queued += 1
+        job_id = uuid.uuid4().hex
+        video_path = os.path.join(self.upload_dir, f"{job_id}.video")
+        loop = asyncio.get_running_loop()
+        try:
+            # O vídeo é gravado em disco em blocos, sem carregar o arquivo inteiro na memória.
+            # As escritas rodam em uma thread para não travar o event loop durante uploads grandes
+            with open(video_path, 'wb') as f:
+                async for chunk in request.content.iter_chunked(UPLOAD_CHUNK_SIZE):
+                    await loop.run_in_executor(None, f.write, chunk)
+        except BaseException:
+            self.queued -= 1
+            if os.path.exists(video_path):
+                os.remove(video_path)
+            raise
+
+        self.jobs[job_id] = {'status': 'queued', 'name': name, 'submitted_at': time.time(), 'result': None, 'error': None}
+        self.counters['accepted'] += 1
+        self._forget_old_jobs()
+        task = asyncio.create_task(self._run_job(job_id, video_path, name, params))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.json_response({'job_id': job_id, 'status': 'queued'}, status=202)
+
+    async def _run_job(self, job_id, video_path, name, params):
+        job = self.jobs[job_id]
+        try:
+            async with self._slots:
+                self.queued -= 1
+                self.running += 1
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+                try:
+                    loop = asyncio.get_running_loop()
+                    job['result'] = await loop.run_in_executor(self._executor, run_analysis, video_path, name, self.model_path, params)
+                    job['status'] = 'done'
+                    self.counters['completed'] += 1
+                except Exception as e:
+                    job['status'] = 'failed'
+                    job['error'] = str(e)
+                    self.counters['failed'] += 1
+                finally:
+                    self.running -= 1
+                    job['finished_at'] = time.time()
+                    self.recent.append((job['finished_at'], job['finished_at'] - job['started_at']))
+        finally:
+            os.remove(video_path)
+
+    def _get_job(self, request):
+        job = self.jobs.get(request.match_info['job_id'])
+        if job is None:
+            raise web.HTTPNotFound(text="Job não encontrado.")
+        return job
+
+    async def job_status(self, request):
+        job = self._get_job(request)
+        return web.json_response({
+            key: job.get(key) for key in ('status', 'name', 'submitted_at', 'started_at', 'finished_at', 'error')
+        })
+
+    async def job_result(self, request):
+        job = self._get_job(request)
+        if job['status'] == 'failed':
+            return web.json_response({'status': 'failed', 'error': job['error']}, status=500)
+        if job['status'] != 'done':
+            return web.json_response({'status': job['status']}, status=409)
+        return web.json_response(job['result'])
+
+    async def metrics(self, request):
+        now = time.time()
+        last_minute = [duration for finished_at, duration in self.recent if now - finished_at <= 60]
+        return web.json_response({
+            'queue_depth': self.queued,
+            'running': self.running,
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            **{f'jobs_{key}': value for key, value in self.counters.items()},
+            'jobs_finished_last_minute': len(last_minute),
+            'mean_processing_time_s_last_minute': round(sum(last_minute) / len(last_minute), 3) if last_minute else None,
+            'uptime_s': round(now - self.started_at, 1)
+        })
+
+    def create_app(self):
+        # Sem limite de tamanho do corpo: o upload é lido em streaming
+        app = web.Application(client_max_size=0)
+        app.router.add_post('/jobs', self.submit_job)
+        app.router.add_get('/jobs/{job_id}', self.job_status)
+        app.router.add_get('/jobs/{job_id}/result', self.job_result)
+        app.router.add_get('/metrics', self.metrics)
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--max-queue', type=int, default=8)
+    parser.add_argument('--upload-dir', default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    service = AnalysisService(args.model, args.workers, args.max_queue, args.upload_dir)
+    web.run_app(service.create_app(), host=args.host, port=args.port)